@@ -0,0 +1,3 @@
+#!/usr/bin/bash
+
+python3 src/benchmark.py "$@"
\ No newline at end of file
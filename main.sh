@@ -1,4 +1,3 @@
 #!/usr/bin/bash
 
-python3 ~/src/static-site-generator/src/main.py
-cd public && python3 -m http.server 8888
\ No newline at end of file
+python3 ~/src/static-site-generator/src/main.py --serve --watch --port 8888
\ No newline at end of file
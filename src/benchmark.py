@@ -0,0 +1,197 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+from main import generate_page
+from markdown_parser import MarkdownParser
+from textnode import TextNode
+
+
+def generate_long_list(items: int) -> str:
+  return "\n".join(f"{index + 1}. Item number {index + 1} with a [link](/items/{index})"
+                   for index in range(items))
+
+def generate_deep_quote(depth: int, lines_per_level: int = 2) -> str:
+  lines: List[str] = []
+  for level in range(1, depth + 1):
+    lines.extend(f"{'>' * level} Quote line {line} at level {level}" for line in range(lines_per_level))
+
+  return "\n".join(lines)
+
+def generate_inline_paragraph(spans: int) -> str:
+  pieces = ["Some plain text", "**bold words**", "_italic words_", "`inline code`",
+            "[a link](https://boot.dev)", "![an image](/images/tolkien.png)"]
+
+  return " ".join(pieces[index % len(pieces)] for index in range(spans))
+
+def generate_inline_paragraphs(paragraphs: int, spans: int = 30) -> str:
+  return "\n\n".join(generate_inline_paragraph(spans) for _ in range(paragraphs))
+
+def generate_code_block(lines: int) -> str:
+  body = "\n".join(f"    value_{index} = compute({index}) # line {index}" for index in range(lines))
+  return f"```\n{body}\n```"
+
+def generate_document(scale: int) -> str:
+  return "\n\n".join([
+    "# Generated document",
+    generate_inline_paragraphs(5 * scale),
+    "## A list",
+    generate_long_list(20 * scale),
+    generate_deep_quote(3, 2 * scale),
+    generate_code_block(20 * scale),
+  ])
+
+def generate_site(root: str, pages: int, scale: int = 1) -> Tuple[str, str]:
+  content_path = os.path.join(root, "content")
+  template_path = os.path.join(root, "template.html")
+
+  for index in range(pages):
+    page_path = os.path.join(content_path, f"section{index % 10}", f"page{index}", "index.md")
+    os.makedirs(os.path.dirname(page_path), exist_ok=True)
+    with open(page_path, "w") as page_file:
+      page_file.write(generate_document(scale))
+
+  with open(template_path, "w") as template_file:
+    template_file.write('<html><head><title>{{ Title }}</title><link href="/index.css" /></head>'
+                        '<body><article>{{ Content }}</article></body></html>')
+
+  return content_path, template_path
+
+def measure(function: Callable[[], object], repeats: int) -> Dict[str, float]:
+  timings = timeit.repeat(function, repeat=repeats, number=1)
+
+  return {
+    "min": min(timings),
+    "median": statistics.median(timings),
+    "mean": statistics.mean(timings),
+    "repeats": repeats
+  }
+
+def corpora(scale: int) -> Dict[str, str]:
+  return {
+    "long_list": generate_long_list(2000 * scale),
+    "deep_quote": generate_deep_quote(50, 20 * scale),
+    "inline_paragraphs": generate_inline_paragraphs(200 * scale),
+    "big_code": generate_code_block(5000 * scale),
+    "mixed_document": generate_document(10 * scale),
+  }
+
+def parser_benchmarks(scale: int) -> Dict[str, Callable[[], object]]:
+  benchmarks: Dict[str, Callable[[], object]] = {}
+
+  for name, markdown in corpora(scale).items():
+    blocks = MarkdownParser.markdown_to_blocks(markdown)
+    node = MarkdownParser.markdown_to_html_node(markdown)
+
+    benchmarks[f"markdown_to_blocks/{name}"] = lambda markdown=markdown: MarkdownParser.markdown_to_blocks(markdown)
+    benchmarks[f"markdown_to_typed_blocks/{name}"] = (
+      lambda markdown=markdown: MarkdownParser.markdown_to_typed_blocks(markdown))
+    benchmarks[f"block_to_block_type/{name}"] = (
+      lambda blocks=blocks: [MarkdownParser.block_to_block_type(block) for block in blocks])
+    benchmarks[f"markdown_to_html_node/{name}"] = (
+      lambda markdown=markdown: MarkdownParser.markdown_to_html_node(markdown))
+    benchmarks[f"parse_document/{name}"] = (
+      lambda markdown=markdown: MarkdownParser.parse_document(markdown))
+    benchmarks[f"to_html/{name}"] = lambda node=node: node.to_html()
+
+  paragraph = generate_inline_paragraph(50 * scale)
+  benchmarks["text_to_textnodes/inline_paragraph"] = lambda: TextNode.text_to_textnodes(paragraph)
+
+  return benchmarks
+
+def run_benchmarks(scale: int, 
+                   repeats: int, 
+                   pages: int, 
+                   jobs: int, 
+                   io_concurrency: int, 
+                   name_filter: str) -> Dict[str, Dict[str, float]]:
+  results: Dict[str, Dict[str, float]] = {}
+
+  for name, function in parser_benchmarks(scale).items():
+    if name_filter in name:
+      results[name] = measure(function, repeats)
+
+  name = f"generate_page/{pages}_pages"
+  if jobs > 1:
+    name = f"{name}_{jobs}_jobs"
+  elif io_concurrency > 0:
+    name = f"{name}_{io_concurrency}_io"
+
+  if name_filter in name:
+    with tempfile.TemporaryDirectory() as root:
+      content_path, template_path = generate_site(root, pages, scale)
+      output_path = os.path.join(root, "docs")
+
+      def build() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+          generate_page(content_path, template_path, output_path, "/", None, jobs, 
+                        io_concurrency=io_concurrency)
+
+      results[name] = measure(build, repeats)
+
+  return results
+
+def current_commit() -> str | None:
+  try:
+    return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                          capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+def print_comparison(baseline: Dict, results: Dict[str, Dict[str, float]]) -> None:
+  print(f"{'benchmark':<45} {'baseline':>10} {'current':>10} {'speedup':>8}", file=sys.stderr)
+  for name, result in results.items():
+    previous = baseline["results"].get(name)
+    if not previous:
+      continue
+
+    speedup = previous["min"] / result["min"] if result["min"] else float("inf")
+    print(f"{name:<45} {previous['min']:>10.4f} {result['min']:>10.4f} {speedup:>7.2f}x", file=sys.stderr)
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description="Times the parser, the renderer and the full build on synthetic markdown.")
+  parser.add_argument("--scale", type=int, default=1, help="multiplies the size of every corpus")
+  parser.add_argument("--repeats", type=int, default=5, help="timed runs per benchmark, the minimum is reported")
+  parser.add_argument("--pages", type=int, default=200, help="pages of the generated site for generate_page")
+  parser.add_argument("--jobs", type=int, default=1, help="worker processes for the generate_page benchmark")
+  parser.add_argument("--io-concurrency", type=int, default=0, 
+                      help="pages read ahead and written behind by the generate_page benchmark")
+  parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+  parser.add_argument("--output", help="write the json results to this file instead of stdout")
+  parser.add_argument("--compare", help="json results of an earlier run to print speedups against")
+  arguments = parser.parse_args()
+
+  started = time.time()
+  report = {
+    "commit": current_commit(),
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "started": started,
+    "arguments": vars(arguments),
+    "results": run_benchmarks(arguments.scale, arguments.repeats, arguments.pages,
+                              arguments.jobs, arguments.io_concurrency, arguments.filter)
+  }
+
+  if arguments.output:
+    with open(arguments.output, "w") as output_file:
+      json.dump(report, output_file, indent=2)
+  else:
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+  if arguments.compare:
+    with open(arguments.compare, "r") as baseline_file:
+      print_comparison(json.load(baseline_file), report["results"])
+
+if __name__ == "__main__":
+  main()
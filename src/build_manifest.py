@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+from typing import Dict, List
+from typing_extensions import Self
+
+from utilities import open_atomic
+
+
+class BuildManifest:
+  '''Remembers, per markdown source, the hashes of the inputs its output page was built from.'''
+
+  def __init__(self, path: str, entries: Dict[str, Dict] = None) -> None:
+    self.path = path
+    self.entries = entries if entries != None else {}
+
+  def load(path: str) -> Self:
+    if not os.path.exists(path):
+      return BuildManifest(path)
+
+    with open(path, "r") as manifest_file:
+      try:
+        entries = json.load(manifest_file)
+      except json.JSONDecodeError:
+        # a corrupted manifest only costs us a full rebuild
+        entries = {}
+
+    return BuildManifest(path, entries)
+
+  def hash_content(content: str | bytes) -> str:
+    if isinstance(content, str):
+      content = content.encode("utf-8")
+
+    return hashlib.sha256(content).hexdigest()
+
+  def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as input_file:
+      for chunk in iter(lambda: input_file.read(1024 * 1024), b""):
+        digest.update(chunk)
+
+    return digest.hexdigest()
+
+  def is_up_to_date(self, source: str, inputs: Dict[str, str], output: str) -> bool:
+    entry = self.entries.get(source)
+    if not entry:
+      return False
+
+    return (entry["inputs"] == inputs and
+            entry["output"] == output and
+            os.path.exists(output))
+
+  def record(self, source: str, inputs: Dict[str, str], output: str) -> None:
+    self.entries[source] = { "inputs": inputs, "output": output }
+
+  def removed_sources(self, current_sources: List[str]) -> List[str]:
+    current = set(current_sources)
+    return [source for source in self.entries if source not in current]
+
+  def dependents(self, paths: List[str]) -> List[str]:
+    '''Sources whose recorded input files include any of paths.'''
+    changed = {os.path.normpath(path) for path in paths}
+    return [source for source, entry in self.entries.items()
+            if any(os.path.normpath(path) in changed for path in entry["inputs"].get("files", {}))]
+
+  def forget(self, source: str) -> str | None:
+    entry = self.entries.pop(source, None)
+    return entry["output"] if entry else None
+
+  def save(self) -> None:
+    with open_atomic(self.path) as manifest_file:
+      json.dump(self.entries, manifest_file, indent=2, sort_keys=True)
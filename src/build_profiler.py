@@ -0,0 +1,137 @@
+import contextlib
+import sys
+import time
+from typing import Callable, Dict, Iterator, List
+from typing_extensions import Self
+
+from markdown_parser import MarkdownParser
+
+# there is no title stage, parse_document captures the title during block_split and a streamed
+# page finds it with a scan of its mapped file, timed as read
+STAGES = [
+  "read",
+  "block_split",
+  "inline_parsing",
+  "html_nodes",
+  "serialization",
+  "templating",
+  "write",
+]
+
+
+class _StageTimer:
+  __slots__ = ("profiler", "name")
+
+  def __init__(self, profiler: "BuildProfiler", name: str) -> None:
+    self.profiler = profiler
+    self.name = name
+
+  def __enter__(self) -> None:
+    self.profiler.stack.append([self.name, time.perf_counter(), sys.getallocatedblocks(), 0.0, 0])
+
+  def __exit__(self, *exception) -> None:
+    name, started, started_blocks, child_seconds, child_blocks = self.profiler.stack.pop()
+    seconds = time.perf_counter() - started
+    blocks = sys.getallocatedblocks() - started_blocks
+
+    # stages nest (inline parsing runs inside html_nodes), each one only keeps its exclusive share
+    stage = self.profiler.current_page["stages"].setdefault(name, [0.0, 0])
+    stage[0] += seconds - child_seconds
+    stage[1] += blocks - child_blocks
+
+    if self.profiler.stack:
+      self.profiler.stack[-1][3] += seconds
+      self.profiler.stack[-1][4] += blocks
+
+
+class BuildProfiler:
+  '''Wall time per page and per build stage, and the net change of live memory blocks per stage.
+
+  The block count is what a stage leaves allocated, e.g. the nodes it builds. Temporaries it
+  allocates and frees again cancel out, so it is no measure of allocation churn.'''
+
+  def __init__(self, enabled: bool = True) -> None:
+    self.enabled = enabled
+    self.pages: Dict[str, Dict] = {}
+    self.current_page: Dict = None
+    self.stack: List[List] = []
+
+  def begin_page(self, page: str) -> None:
+    if not self.enabled:
+      return
+
+    self.end_page()
+    self.current_page = { "started": time.perf_counter(), "total": 0.0, "stages": {} }
+    self.pages[page] = self.current_page
+
+  def end_page(self) -> None:
+    if self.current_page != None:
+      self.current_page["total"] = time.perf_counter() - self.current_page["started"]
+      self.current_page = None
+
+  def stage(self, name: str) -> _StageTimer | contextlib.nullcontext:
+    if self.current_page == None:
+      return contextlib.nullcontext()
+
+    return _StageTimer(self, name)
+
+  def _timed(self, name: str, function: Callable) -> Callable:
+    def timed_function(*args, **kwargs):
+      with self.stage(name):
+        return function(*args, **kwargs)
+
+    return timed_function
+
+  @contextlib.contextmanager
+  def instrument(self) -> Iterator[Self]:
+    '''Times the parser stages that run inside MarkdownParser.parse_document.'''
+    originals = {
+      # blocks are typed while they are split, so block_split covers both
+      "lines_to_typed_blocks": ("block_split", MarkdownParser.lines_to_typed_blocks),
+      "text_to_children": ("inline_parsing", MarkdownParser.text_to_children),
+    }
+
+    for attribute, (name, function) in originals.items():
+      setattr(MarkdownParser, attribute, self._timed(name, function))
+    try:
+      yield self
+    finally:
+      for attribute, (name, function) in originals.items():
+        setattr(MarkdownParser, attribute, function)
+      self.end_page()
+
+  def stage_totals(self) -> Dict[str, List]:
+    totals: Dict[str, List] = {name: [0.0, 0] for name in STAGES}
+    for page in self.pages.values():
+      for name, (seconds, blocks) in page["stages"].items():
+        totals[name][0] += seconds
+        totals[name][1] += blocks
+
+    return totals
+
+  def report(self, top: int = 20) -> str:
+    slowest = sorted(self.pages.items(), key=lambda item: item[1]["total"], reverse=True)[:top]
+    page_width = min(max([len(page) for page, _ in slowest] + [len("page")]), 60)
+
+    lines = [f"slowest {len(slowest)} of {len(self.pages)} pages, wall time in ms:"]
+    lines.append(" ".join([f"{'page':<{page_width}}", f"{'total':>9}"] +
+                          [f"{name:>14}" for name in STAGES]))
+
+    for page, timings in slowest:
+      stages = timings["stages"]
+      lines.append(" ".join([f"{page[-page_width:]:<{page_width}}", f"{timings['total'] * 1000:>9.2f}"] +
+                            [f"{stages.get(name, [0.0])[0] * 1000:>14.2f}" for name in STAGES]))
+
+    totals = self.stage_totals()
+    total_seconds = sum(seconds for seconds, _ in totals.values())
+    lines.append("")
+    lines.append(f"{'stage':<16} {'ms':>10} {'share':>7} {'net live blocks':>16}")
+    for name in sorted(STAGES, key=lambda name: totals[name][0], reverse=True):
+      seconds, blocks = totals[name]
+      share = seconds / total_seconds * 100 if total_seconds else 0.0
+      lines.append(f"{name:<16} {seconds * 1000:>10.2f} {share:>6.1f}% {blocks:>16}")
+
+    return "\n".join(lines)
+
+# default of the build functions, a profiler that never starts a page records nothing
+DISABLED_PROFILER = BuildProfiler(enabled=False)
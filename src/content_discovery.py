@@ -0,0 +1,122 @@
+import json
+import os
+import time
+from typing import Dict, List, Set, Tuple
+from typing_extensions import Self
+
+from utilities import open_atomic
+
+# a directory changed this recently may change again within the same mtime tick, it is not cached
+_RACY_NANOSECONDS = 2 * 1000 * 1000 * 1000
+
+
+class ContentPage:
+  '''A markdown source below the content directory and the page it is rendered to.'''
+  __slots__ = ("source", "relative_path", "output_path")
+
+  def __init__(self, source: str, relative_path: str, output_path: str) -> None:
+    self.source = source
+    self.relative_path = relative_path
+    self.output_path = output_path
+
+  def __eq__(self, other: object) -> bool:
+    if (not isinstance(other, ContentPage)):
+      return False
+
+    return ((self.source == other.source) and
+            (self.relative_path == other.relative_path) and
+            (self.output_path == other.output_path))
+
+  def __repr__(self) -> str:
+    return f"ContentPage({self.source}, {self.relative_path}, {self.output_path})"
+
+
+class DirectoryCache:
+  '''Markdown files and subdirectories per content directory, valid while its mtime is unchanged.
+
+  Adding, removing or renaming an entry updates the mtime of its directory, so an unchanged
+  directory only costs a stat instead of a listing.'''
+
+  def __init__(self, path: str, entries: Dict[str, Dict] = None) -> None:
+    self.path = path
+    self.entries = entries if entries != None else {}
+
+  def load(path: str) -> Self:
+    try:
+      with open(path, "r") as cache_file:
+        entries = json.load(cache_file)
+    except (OSError, json.JSONDecodeError):
+      # a missing or corrupted cache only costs one full scan
+      entries = {}
+
+    return DirectoryCache(path, entries)
+
+  def list(self, directory: str) -> Tuple[List[str], List[str]]:
+    '''The markdown file names and the subdirectory names of directory, both sorted.'''
+    mtime = os.stat(directory).st_mtime_ns
+    entry = self.entries.get(directory)
+    if entry != None and entry["mtime"] == mtime:
+      return entry["files"], entry["directories"]
+
+    files: List[str] = []
+    directories: List[str] = []
+    with os.scandir(directory) as scanned_entries:
+      for scanned_entry in scanned_entries:
+        if scanned_entry.is_dir():
+          # like os.walk, symlinked directories are not followed
+          if not scanned_entry.is_symlink():
+            directories.append(scanned_entry.name)
+        elif scanned_entry.name.endswith(".md"):
+          files.append(scanned_entry.name)
+
+    files.sort()
+    directories.sort()
+    if time.time_ns() - mtime > _RACY_NANOSECONDS:
+      self.entries[directory] = { "mtime": mtime, "files": files, "directories": directories }
+    else:
+      self.entries.pop(directory, None)
+
+    return files, directories
+
+  def retain(self, directories: Set[str]) -> None:
+    self.entries = {directory: entry for directory, entry in self.entries.items() if directory in directories}
+
+  def save(self) -> None:
+    with open_atomic(self.path) as cache_file:
+      json.dump(self.entries, cache_file)
+
+
+def output_path(relative_path: str, dest_path: str) -> str:
+  return os.path.join(dest_path, f"{os.path.splitext(relative_path)[0]}.html")
+
+def discover_pages(from_path: str, dest_path: str, cache: DirectoryCache = None) -> List[ContentPage]:
+  '''Finds every markdown page below from_path, in sorted order, with its relative and output paths.'''
+  if cache == None:
+    cache = DirectoryCache(None)
+  if not os.path.isdir(from_path):
+    return []
+
+  pages: List[ContentPage] = []
+  visited: Set[str] = set()
+  # (directory, its path relative to from_path), depth first like os.walk
+  pending: List[Tuple[str, str]] = [(from_path, "")]
+
+  while pending:
+    directory, relative_directory = pending.pop()
+    visited.add(directory)
+    files, directories = cache.list(directory)
+
+    for file in files:
+      relative_path = os.path.join(relative_directory, file)
+      pages.append(ContentPage(os.path.join(directory, file),
+                               relative_path,
+                               output_path(relative_path, dest_path)))
+
+    for subdirectory in reversed(directories):
+      pending.append((os.path.join(directory, subdirectory), os.path.join(relative_directory, subdirectory)))
+
+  cache.retain(visited)
+  if cache.path != None:
+    cache.save()
+
+  return pages
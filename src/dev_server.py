@@ -0,0 +1,296 @@
+import ctypes
+import ctypes.util
+import http.server
+import mimetypes
+import os
+import select
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Set, Tuple
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_WATCH_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO |
+                  _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF)
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+# editors save a file in several steps, changes arriving this close together are one rebuild
+_DEBOUNCE_SECONDS = 0.1
+
+
+class PollingWatcher:
+  '''Finds changed files by comparing modification times and sizes between scans.'''
+
+  def __init__(self, paths: List[str], interval: float = 0.5) -> None:
+    self.paths = paths
+    self.interval = interval
+    self.snapshot = self._scan()
+
+  def _scan(self) -> Dict[str, Tuple[int, int]]:
+    snapshot: Dict[str, Tuple[int, int]] = {}
+    for path in self.paths:
+      if os.path.isfile(path):
+        files = [ path ]
+      else:
+        files = [os.path.join(root, file) for root, dirs, names in os.walk(path) for file in names]
+
+      for file in files:
+        try:
+          stat = os.stat(file)
+        except FileNotFoundError:
+          continue
+        snapshot[file] = (stat.st_mtime_ns, stat.st_size)
+
+    return snapshot
+
+  def poll(self) -> Set[str]:
+    current = self._scan()
+    changed = {path for path in current.keys() | self.snapshot.keys()
+               if current.get(path) != self.snapshot.get(path)}
+    self.snapshot = current
+
+    return changed
+
+  def wait_for_changes(self, timeout: float = None) -> Set[str]:
+    deadline = time.monotonic() + timeout if timeout != None else None
+
+    while True:
+      changed = self.poll()
+      if changed or (deadline != None and time.monotonic() >= deadline):
+        return changed
+      time.sleep(self.interval)
+
+  def close(self) -> None:
+    pass
+
+
+class InotifyWatcher:
+  '''Linux inotify watches on every directory below the watched paths, raises OSError elsewhere.'''
+
+  def __init__(self, paths: List[str]) -> None:
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+      raise OSError("inotify is not available on this platform")
+
+    self.libc = libc
+    self.fd = libc.inotify_init1(os.O_CLOEXEC)
+    if self.fd < 0:
+      raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    self.paths = paths
+    # watch descriptor -> directory, and the file names reported for it (None reports all of them)
+    self.directories: Dict[int, str] = {}
+    self.file_filters: Dict[int, Set[str] | None] = {}
+
+    for path in paths:
+      if os.path.isdir(path):
+        self._watch_tree(path)
+      else:
+        wd = self._watch_directory(os.path.dirname(path) or ".")
+        if self.file_filters.get(wd, set()) != None:
+          self.file_filters.setdefault(wd, set()).add(os.path.basename(path))
+
+  def _watch_directory(self, directory: str) -> int:
+    wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), _IN_WATCH_MASK)
+    if wd < 0:
+      raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+
+    self.directories[wd] = directory
+    return wd
+
+  def _watch_tree(self, root: str) -> Set[str]:
+    files: Set[str] = set()
+    for directory, dirs, names in os.walk(root):
+      wd = self._watch_directory(directory)
+      self.file_filters[wd] = None
+      files.update(os.path.join(directory, name) for name in names)
+
+    return files
+
+  def _read_events(self) -> Set[str]:
+    changed: Set[str] = set()
+    buffer = os.read(self.fd, 64 * 1024)
+    offset = 0
+
+    while offset < len(buffer):
+      wd, mask, cookie, length = _INOTIFY_EVENT.unpack_from(buffer, offset)
+      name = buffer[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + length].rstrip(b"\0")
+      offset += _INOTIFY_EVENT.size + length
+
+      if mask & _IN_Q_OVERFLOW:
+        # events were lost, report every watched path so the caller rebuilds everything
+        changed.update(self.paths)
+        continue
+
+      if mask & _IN_IGNORED:
+        self.directories.pop(wd, None)
+        self.file_filters.pop(wd, None)
+        continue
+
+      if wd not in self.directories or not name:
+        continue
+
+      name = os.fsdecode(name)
+      file_filter = self.file_filters.get(wd)
+      if file_filter != None and name not in file_filter:
+        continue
+
+      path = os.path.join(self.directories[wd], name)
+      changed.add(path)
+
+      if (mask & _IN_ISDIR) and (mask & (_IN_CREATE | _IN_MOVED_TO)):
+        # a new directory may already hold files by the time its watch is added
+        changed.update(self._watch_tree(path))
+
+    return changed
+
+  def wait_for_changes(self, timeout: float = None) -> Set[str]:
+    readable, _, _ = select.select([ self.fd ], [], [], timeout)
+    if not readable:
+      return set()
+
+    changed = self._read_events()
+    while select.select([ self.fd ], [], [], _DEBOUNCE_SECONDS)[0]:
+      changed.update(self._read_events())
+
+    return changed
+
+  def close(self) -> None:
+    os.close(self.fd)
+
+
+def create_watcher(paths: List[str]) -> InotifyWatcher | PollingWatcher:
+  try:
+    return InotifyWatcher(paths)
+  except (OSError, AttributeError, TypeError):
+    print("inotify is not available, watching for changes by polling...")
+    return PollingWatcher(paths)
+
+
+class PageCache:
+  '''Bytes of the served files, kept in memory until the next rebuild.
+
+  Only files up to max_file_size are kept, and only while all of them fit into max_size,
+  anything else is streamed from disk by the default handler.'''
+
+  def __init__(self, max_size: int = 64 * 1024 * 1024, max_file_size: int = 1024 * 1024) -> None:
+    self.files: Dict[str, bytes] = {}
+    self.size = 0
+    self.max_size = max_size
+    self.max_file_size = max_file_size
+    # bumped by every clear, a file read before a rebuild must not be cached after it
+    self.generation = 0
+    self.lock = threading.Lock()
+
+  def get(self, path: str) -> bytes | None:
+    with self.lock:
+      content = self.files.get(path)
+      generation = self.generation
+    if content != None:
+      return content
+
+    if not os.path.isfile(path) or os.path.getsize(path) > self.max_file_size:
+      return None
+
+    with open(path, "rb") as input_file:
+      content = input_file.read()
+    with self.lock:
+      if (self.generation == generation and 
+          path not in self.files and 
+          self.size + len(content) <= self.max_size):
+        self.files[path] = content
+        self.size += len(content)
+
+    return content
+
+  def clear(self) -> None:
+    with self.lock:
+      self.files.clear()
+      self.size = 0
+      self.generation += 1
+
+
+def create_handler(directory: str, cache: PageCache) -> type:
+  class CachedRequestHandler(http.server.SimpleHTTPRequestHandler):
+    def __init__(self, *args, **kwargs) -> None:
+      super().__init__(*args, directory=directory, **kwargs)
+
+    def _cached_content(self) -> Tuple[str, bytes | None]:
+      path = self.translate_path(self.path)
+      if os.path.isdir(path):
+        if not self.path.split("?")[0].endswith("/"):
+          # let the default handler redirect to the directory url
+          return path, None
+        path = os.path.join(path, "index.html")
+
+      return path, cache.get(path)
+
+    def _send_cached_headers(self, path: str, content: bytes) -> None:
+      self.send_response(200)
+      self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+      self.send_header("Content-Length", str(len(content)))
+      self.send_header("Cache-Control", "no-cache")
+      self.end_headers()
+
+    def do_GET(self) -> None:
+      path, content = self._cached_content()
+      if content == None:
+        return super().do_GET()
+
+      self._send_cached_headers(path, content)
+      self.wfile.write(content)
+
+    def do_HEAD(self) -> None:
+      path, content = self._cached_content()
+      if content == None:
+        return super().do_HEAD()
+
+      self._send_cached_headers(path, content)
+
+  return CachedRequestHandler
+
+
+def serve(directory: str,
+          port: int,
+          watch_paths: List[str] = None,
+          on_change: Callable[[Set[str]], None] = None) -> None:
+  '''Serves directory from memory, rebuilding through on_change whenever a watched path changes.'''
+  cache = PageCache()
+  server = http.server.ThreadingHTTPServer(("", port), create_handler(directory, cache))
+  server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+  server_thread.start()
+  print(f"Serving {directory} at http://localhost:{port}/")
+
+  watcher = create_watcher(watch_paths) if watch_paths else None
+  try:
+    while True:
+      if watcher == None:
+        server_thread.join()
+        continue
+
+      changed = watcher.wait_for_changes()
+      if not changed:
+        continue
+
+      print(f"{len(changed)} changed file(s), rebuilding...")
+      try:
+        on_change(changed)
+      except Exception as error:
+        # a broken page should not take the server down, the next save gets another try
+        print(f"rebuild failed: {error}")
+      cache.clear()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    if watcher != None:
+      watcher.close()
+    server.shutdown()
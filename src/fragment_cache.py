@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import shutil
+from typing import Set, Tuple
+
+import htmlnode
+import leafnode
+import markdown_parser
+import parentnode
+import textnode
+import utilities
+from utilities import open_atomic
+
+# any change to these modules may change the rendered html, so their source is part of every key
+_PARSER_MODULES = [htmlnode, leafnode, markdown_parser, parentnode, textnode, utilities]
+
+
+def parser_version() -> str:
+  digest = hashlib.sha256()
+  for module in _PARSER_MODULES:
+    with open(module.__file__, "rb") as source_file:
+      digest.update(source_file.read())
+
+  return digest.hexdigest()
+
+
+class FragmentCache:
+  '''Rendered title and content html of markdown documents, keyed by markdown, basepath and parser version.'''
+
+  def __init__(self, directory: str, version: str = None) -> None:
+    self.directory = directory
+    self.version = version if version != None else parser_version()
+    self.used_keys: Set[str] = set()
+
+  def key(self, markdown: str, basepath: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(self.version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(basepath.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(markdown.encode("utf-8"))
+
+    return digest.hexdigest()
+
+  def _path(self, key: str) -> str:
+    # two level layout, a single directory with a fragment per page gets slow to list
+    return os.path.join(self.directory, key[:2], f"{key}.json")
+
+  def touch(self, key: str) -> None:
+    self.used_keys.add(key)
+
+  def get(self, key: str) -> Tuple[str, str] | None:
+    self.touch(key)
+    try:
+      with open(self._path(key), "r") as fragment_file:
+        fragment = json.load(fragment_file)
+    except (OSError, json.JSONDecodeError):
+      return None
+
+    return (fragment["title"], fragment["content"])
+
+  def put(self, key: str, title: str, content: str) -> None:
+    self.touch(key)
+    path = self._path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # workers may render the same document at once, the rename keeps readers from a half-written file
+    with open_atomic(path) as fragment_file:
+      json.dump({ "title": title, "content": content }, fragment_file)
+
+  def prune(self) -> None:
+    '''Removes every fragment no page asked for since the cache was opened.'''
+    if not os.path.isdir(self.directory):
+      return
+
+    for root, dirs, files in os.walk(self.directory, topdown=False):
+      for file in files:
+        if os.path.splitext(file)[0] not in self.used_keys:
+          os.remove(os.path.join(root, file))
+      if root != self.directory and not os.listdir(root):
+        os.rmdir(root)
+
+  def clear(self) -> None:
+    if os.path.isdir(self.directory):
+      shutil.rmtree(self.directory)
+    self.used_keys.clear()
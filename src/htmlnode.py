@@ -1,9 +1,12 @@
+import sys
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, TextIO
 from typing_extensions import Self
 
 
 class HTMLNode(ABC):
+  # no per-instance __dict__, a large page holds a great many nodes
+  __slots__ = ("tag", "value", "children", "_props", "_props_html")
 
   @abstractmethod
   def __init__(self, 
@@ -11,20 +14,41 @@ class HTMLNode(ABC):
                value: str = None, 
                children: List[Self] = None,
                props: Dict[str, str] = None) -> None:
-    self.tag = tag
+    # every <p>, <li> or <a> of a page shares one tag string
+    self.tag = sys.intern(tag) if tag != None else None
     self.value = value
     self.children = children
     self.props = props
 
+  @property
+  def props(self: Self) -> Dict[str, str]:
+    return self._props
+
+  @props.setter
+  def props(self: Self, props: Dict[str, str]) -> None:
+    self._props = props
+    # nodes without props share the empty string and never render any, the others render once
+    self._props_html = None if props else ""
+
   @abstractmethod
   def to_html(self: Self) -> str:
     pass  
 
+  def write_html(self: Self, sink: TextIO) -> None:
+    '''Writes the html of the node into a file-like sink, e.g. an open output file or a StringIO.'''
+    sink.write(self.to_html())
+
   def props_to_html(self: Self) -> str:
-    if(not self.props):
-      return ""
-    
-    return " ".join(map(lambda x: f'{x[0]}="{x[1]}"', self.props.items()))
+    return self.attributes_html()[1:]
+
+  def attributes_html(self: Self) -> str:
+    '''The props as they follow the tag, with a leading space, rendered on first use and cached.
+
+    Assigning new props clears the cache, changing the props dict in place does not.'''
+    if self._props_html == None:
+      self._props_html = "".join([f' {name}="{value}"' for name, value in self._props.items()])
+
+    return self._props_html
   
   def __repr__(self: Self) -> str:
     return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
@@ -3,6 +3,8 @@ from htmlnode import HTMLNode
 
 
 class LeafNode(HTMLNode):
+  __slots__ = ()
+
   def __init__(self, 
                value: str, 
                tag: str = None,  
@@ -16,11 +18,7 @@ class LeafNode(HTMLNode):
     if (self.tag == None):
       return str(self.value)
     
-    props_html: str = self.props_to_html()
-    if(len(props_html) > 0):
-      props_html = f" {props_html}"
-
-    return f"<{self.tag}{props_html}>{self.value}</{self.tag}>"  
+    return f"<{self.tag}{self.attributes_html()}>{self.value}</{self.tag}>"  
   
   def __eq__(self, other: object) -> bool:
     if(not isinstance(other, LeafNode)):
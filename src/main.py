@@ -1,63 +1,377 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import cProfile
+import mmap
+import multiprocessing
 import os
 import shutil
-import sys
-from typing import List
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Set, Tuple
 
+from build_manifest import BuildManifest
+from build_profiler import DISABLED_PROFILER, BuildProfiler
+from content_discovery import DirectoryCache, discover_pages, output_path
+from dev_server import serve
+from fragment_cache import FragmentCache
 from markdown_parser import MarkdownParser
 from parentnode import ParentNode
+from precompress import available_encoders, precompress, remove_stale_compressed
+from shards import merge_shards, pages_in_shard, parse_shard, shard_directory, shard_manifest_path
+from static_sync import LinkStrategy, sync_static
+from template import Template
+from utilities import has_content, open_atomic, remove_file
 
-def generate_page(from_path: str , template_path: str, dest_path: str, basepath: str) -> None:
-  print(f"Generating pages from {from_path} to {dest_path} using {template_path}")
+# pages at least this large are rendered straight from the open file, without holding the document
+STREAM_THRESHOLD = 4 * 1024 * 1024
+
+def render_content(markdown: str, 
+                   basepath: str, 
+                   profiler: BuildProfiler = DISABLED_PROFILER) -> Tuple[str, str]:
+  # the title is picked up by the same pass over the lines that builds the content
+  with profiler.stage("html_nodes"):
+    document = MarkdownParser.parse_document(markdown, basepath)
+
+  if document.title == None:
+    raise Exception("Header markup not found.")
+
+  with profiler.stage("serialization"):
+    content_html = document.content.to_html()
+
+  return document.title, content_html
+
+def render_page(markdown: str, 
+                template: Template, 
+                basepath: str, 
+                profiler: BuildProfiler = DISABLED_PROFILER,
+                cache: FragmentCache = None) -> str:
+  if cache == None:
+    page_title, content_html = render_content(markdown, basepath, profiler)
+  else:
+    # the markdown did not change since it was last rendered, only the template has to be applied again
+    fragment_key = cache.key(markdown, basepath)
+    fragment = cache.get(fragment_key)
+    if fragment == None:
+      fragment = render_content(markdown, basepath, profiler)
+      cache.put(fragment_key, *fragment)
+    page_title, content_html = fragment
 
-  template_file = open(template_path, "r")
-  template = template_file.read()
-  template_file.close()
-
-  markdown_pages:List[str] = []
-  for root, dirs, files in os.walk(from_path):
-    for file in files:
-      if file.endswith(".md"):
-        markdown_pages.append(os.path.join(root, file))
-    
-  for page in markdown_pages:
-    input_file = open(page, "r")
-    markdown = input_file.read()
-    input_file.close()
-
-    page_title = MarkdownParser.extract_title(markdown)
-    html_content = MarkdownParser.markdown_to_html_node(markdown).to_html()
-    output_page = template.replace("{{ Title }}", page_title).replace("{{ Content }}", html_content)
-    output_page = output_page.replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
-
-    output_file_path = os.path.join(dest_path, 
-                                    os.path.dirname(page).replace(from_path, "").lstrip("/"),
-                                    f"{os.path.splitext(os.path.basename(page))[0]}.html")
-
-    os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
-    output_file = open(output_file_path, "w")
+  with profiler.stage("templating"):
+    return template.render({ "Title": page_title, "Content": content_html })
+
+def create_output_directories(output_paths: Iterable[str]) -> None:
+  # one makedirs per distinct directory instead of one per page
+  for directory in sorted({os.path.dirname(path) for path in output_paths}):
+    os.makedirs(directory, exist_ok=True)
+
+def write_page(output_file_path: str, output_page: str, skip_unchanged: bool = False) -> None:
+  '''Writes a page into an existing directory, a build that dies midway never leaves half a page.'''
+  # an identical page keeps its mtime, so rsync and cdn caches see no change
+  if skip_unchanged and has_content(output_file_path, output_page.encode("utf-8")):
+    return
+
+  with open_atomic(output_file_path) as output_file:
     output_file.write(output_page)
-    output_file.close()
-
-def recussive_copy(source: str, target: str) -> None:
-  if not os.path.exists(source):
-    raise Exception(f"source path {source}, does not exists.")
-  
-  if not os.path.exists(target):
-    os.makedirs(target)
-  
-  entities_need_copying = os.listdir(source)
-  for entity in entities_need_copying:
-    final_path = os.path.join(source, entity)
-    
-    if not os.path.isfile(final_path):
-      recussive_copy(final_path, os.path.join(target, entity))
+
+def stream_page(page: str,
+                output_file_path: str,
+                template: Template,
+                basepath: str,
+                profiler: BuildProfiler = DISABLED_PROFILER,
+                skip_unchanged: bool = False) -> None:
+  '''Renders a page block by block from its markdown file into its output file.'''
+  with open(page, "rb") as input_file, mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+    if hasattr(mmap, "MADV_SEQUENTIAL"):
+      # lets the kernel read ahead and drop the pages already parsed
+      buffer.madvise(mmap.MADV_SEQUENTIAL)
+
+    # the title is written before the content, but may only appear further down the document
+    with profiler.stage("read"):
+      page_title = MarkdownParser.extract_title_from_buffer(buffer)
+
+    content_node = ParentNode("div", MarkdownParser.iter_html_nodes(MarkdownParser.read_mapped_lines(buffer), 
+                                                                    basepath))
+    # the page is never held whole, so it can only be compared once written to the temporary file
+    with profiler.stage("write"), open_atomic(output_file_path, keep_unchanged=skip_unchanged) as output_file:
+      template.write(output_file, { "Title": page_title, "Content": content_node })
+
+def read_markdown(page: str, stream_threshold: int = STREAM_THRESHOLD) -> str | None:
+  '''Reads a markdown page, None means the page is large enough to be streamed instead.'''
+  size = os.path.getsize(page)
+  # an empty file cannot be memory-mapped, it is read like any small page
+  if size >= stream_threshold and size > 0:
+    return None
+
+  input_file = open(page, "r")
+  markdown = input_file.read()
+  input_file.close()
+
+  return markdown
+
+def build_page(page: str,
+               markdown: str | None,
+               output_file_path: str,
+               template: Template,
+               basepath: str,
+               profiler: BuildProfiler = DISABLED_PROFILER,
+               cache: FragmentCache = None,
+               skip_unchanged: bool = False) -> None:
+  if markdown == None:
+    stream_page(page, output_file_path, template, basepath, profiler, skip_unchanged)
+    return
+
+  output_page = render_page(markdown, template, basepath, profiler, cache)
+  with profiler.stage("write"):
+    write_page(output_file_path, output_page, skip_unchanged)
+
+# state of a --jobs worker process, set once by _init_worker instead of being pickled with every page
+_worker_template: Template = None
+_worker_basepath: str = None
+_worker_cache: FragmentCache = None
+_worker_skip_unchanged: bool = False
+
+def _init_worker(template_path: str, 
+                 basepath: str, 
+                 cache_directory: str, 
+                 cache_version: str,
+                 skip_unchanged: bool) -> None:
+  global _worker_template, _worker_basepath, _worker_cache, _worker_skip_unchanged
+
+  _worker_template = Template.load(template_path, basepath)
+  _worker_basepath = basepath
+  _worker_skip_unchanged = skip_unchanged
+  if cache_directory != None:
+    _worker_cache = FragmentCache(cache_directory, cache_version)
+
+def _build_page_in_worker(job: Tuple[str, str, str]) -> str:
+  page, markdown, output_file_path = job
+  build_page(page, markdown, output_file_path, _worker_template, _worker_basepath, 
+             cache=_worker_cache, skip_unchanged=_worker_skip_unchanged)
+
+  return page
+
+async def build_pages_pipelined(pages: List[str],
+                                prepare_page: Callable[[str, str | None], Tuple[str, str, str] | None],
+                                template: Template,
+                                basepath: str,
+                                cache: FragmentCache,
+                                stream_threshold: int,
+                                concurrency: int,
+                                skip_unchanged: bool = False) -> List[str]:
+  '''Renders pages in order while up to concurrency reads run ahead and as many writes run behind.
+
+  Returns the pages that were written, prepare_page returns None for the ones to skip.'''
+  loop = asyncio.get_running_loop()
+  # reads and writes each get their own threads, rendering stays on the event loop
+  loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(2 * concurrency))
+
+  remaining_pages = iter(pages)
+  reads: Deque[Tuple[str, asyncio.Future]] = collections.deque()
+  writes: Set[asyncio.Future] = set()
+  written_pages: List[str] = []
+
+  def read_ahead() -> None:
+    while len(reads) < concurrency:
+      page = next(remaining_pages, None)
+      if page == None:
+        return
+      reads.append((page, loop.run_in_executor(None, read_markdown, page, stream_threshold)))
+
+  async def wait_for_writes(return_when: str) -> None:
+    done, pending = await asyncio.wait(writes, return_when=return_when)
+    writes.difference_update(done)
+    for write in done:
+      written_pages.append(write.result())
+
+  def write_and_name(page: str, output_file_path: str, output_page: str) -> str:
+    write_page(output_file_path, output_page, skip_unchanged)
+    return page
+
+  def stream_and_name(page: str, output_file_path: str) -> str:
+    stream_page(page, output_file_path, template, basepath, skip_unchanged=skip_unchanged)
+    return page
+
+  read_ahead()
+  while reads:
+    page, read = reads.popleft()
+    markdown = await read
+    read_ahead()
+
+    job = prepare_page(page, markdown)
+    if job == None:
+      continue
+
+    if len(writes) >= concurrency:
+      await wait_for_writes(asyncio.FIRST_COMPLETED)
+
+    _, markdown, output_file_path = job
+    if markdown == None:
+      # a streamed page reads, renders and writes in one go, all of it moves to a thread
+      writes.add(loop.run_in_executor(None, stream_and_name, page, output_file_path))
     else:
-      print(f"copying {final_path} to destination {target}...")
-      shutil.copy(final_path, target)
+      output_page = render_page(markdown, template, basepath, cache=cache)
+      writes.add(loop.run_in_executor(None, write_and_name, page, output_file_path, output_page))
+
+  if writes:
+    await wait_for_writes(asyncio.ALL_COMPLETED)
+
+  return written_pages
+
+def output_path_for(page: str, from_path: str, dest_path: str) -> str:
+  return output_path(os.path.relpath(page, from_path), dest_path)
+
+def template_hashes(template: Template) -> Dict[str, str]:
+  return {path: BuildManifest.hash_content(source) for path, source in template.dependencies.items()}
+
+def page_inputs(page: str, 
+                markdown: str | None, 
+                template_files: Dict[str, str], 
+                basepath: str) -> Dict[str, Dict[str, str] | str]:
+  '''Every input a page is rendered from, a change to any of them means the page is out of date.'''
+  # a streamed page was never read whole, its file is hashed in chunks
+  markdown_hash = BuildManifest.hash_content(markdown) if markdown != None else BuildManifest.hash_file(page)
+
+  return { 
+    "files": { page: markdown_hash, **template_files },
+    "basepath": basepath
+  }
+
+def generate_page(from_path: str,
+                  template_path: str,
+                  dest_path: str,
+                  basepath: str,
+                  manifest: BuildManifest = None,
+                  jobs: int = 1,
+                  profiler: BuildProfiler = DISABLED_PROFILER,
+                  cache: FragmentCache = None,
+                  stream_threshold: int = STREAM_THRESHOLD,
+                  io_concurrency: int = 0,
+                  skip_unchanged: bool = False,
+                  shard: Tuple[int, int] = None,
+                  discovery: DirectoryCache = None) -> None:
+  print(f"Generating pages from {from_path} to {dest_path} using {template_path}")
+
+  template = Template.load(template_path, basepath)
 
-def copy_static(static_path:str, output_path:str) -> None:
-  source_path = os.path.join(os.getcwd(), static_path)
-  recussive_copy(source_path, output_path)
+  content_pages = discover_pages(from_path, dest_path, discovery)
+  if shard != None:
+    content_pages = pages_in_shard(content_pages, shard)
+    print(f"Building shard {shard[0]} of {shard[1]}, {len(content_pages)} pages")
+
+  markdown_pages = [content_page.source for content_page in content_pages]
+  output_paths = {content_page.source: content_page.output_path for content_page in content_pages}
+  create_output_directories(output_paths.values())
+
+  template_files = template_hashes(template) if manifest != None else None
+  built_pages: Dict[str, Tuple[Dict[str, str], str]] = {}
+
+  def prepare_page(page: str, markdown: str | None) -> Tuple[str, str, str] | None:
+    output_file_path = output_paths[page]
+
+    if cache != None and markdown != None:
+      # keeps the fragment of every current page, including the skipped ones, out of the prune
+      cache.touch(cache.key(markdown, basepath))
+
+    if manifest != None:
+      inputs = page_inputs(page, markdown, template_files, basepath)
+      if manifest.is_up_to_date(page, inputs, output_file_path):
+        return None
+      built_pages[page] = (inputs, output_file_path)
+
+    return (page, markdown, output_file_path)
+
+  def pages_to_build() -> Iterator[Tuple[str, str, str]]:
+    for page in markdown_pages:
+      profiler.begin_page(page)
+      with profiler.stage("read"):
+        markdown = read_markdown(page, stream_threshold)
+
+      job = prepare_page(page, markdown)
+      if job != None:
+        yield job
+
+  if jobs > 1:
+    # pages are rendered and written by the workers, only their names are streamed back
+    cache_arguments = (cache.directory, cache.version) if cache != None else (None, None)
+    with multiprocessing.Pool(jobs, 
+                              initializer=_init_worker, 
+                              initargs=(template_path, basepath, *cache_arguments, skip_unchanged)) as pool:
+      for page in pool.imap_unordered(_build_page_in_worker, pages_to_build(), chunksize=8):
+        if manifest != None:
+          manifest.record(page, *built_pages.pop(page))
+  elif io_concurrency > 0:
+    written_pages = asyncio.run(build_pages_pipelined(markdown_pages, prepare_page, template, basepath, 
+                                                      cache, stream_threshold, io_concurrency, 
+                                                      skip_unchanged))
+    if manifest != None:
+      for page in written_pages:
+        manifest.record(page, *built_pages.pop(page))
+  else:
+    for page, markdown, output_file_path in pages_to_build():
+      build_page(page, markdown, output_file_path, template, basepath, profiler, cache, skip_unchanged)
+      profiler.end_page()
+
+      if manifest != None:
+        manifest.record(page, *built_pages.pop(page))
+
+  if manifest != None:
+    for removed_page in manifest.removed_sources(markdown_pages):
+      removed_output = manifest.forget(removed_page)
+      if remove_file(removed_output, dest_path):
+        print(f"removing {removed_output}, its source no longer exists...")
+    manifest.save()
+
+  if cache != None:
+    cache.prune()
+
+def regenerate_pages(pages: List[str],
+                     from_path: str,
+                     template_path: str,
+                     dest_path: str,
+                     basepath: str,
+                     manifest: BuildManifest,
+                     cache: FragmentCache = None,
+                     stream_threshold: int = STREAM_THRESHOLD,
+                     skip_unchanged: bool = False) -> None:
+  '''Re-renders only the given markdown pages, removing the output of the ones that were deleted.'''
+  template = Template.load(template_path, basepath)
+  template_files = template_hashes(template)
+
+  for page in pages:
+    if not os.path.exists(page):
+      removed_output = manifest.forget(page)
+      if remove_file(removed_output, dest_path):
+        print(f"removing {removed_output}, its source no longer exists...")
+      continue
+
+    markdown = read_markdown(page, stream_threshold)
+
+    output_file_path = output_path_for(page, from_path, dest_path)
+    inputs = page_inputs(page, markdown, template_files, basepath)
+    if manifest.is_up_to_date(page, inputs, output_file_path):
+      continue
+
+    print(f"regenerating {output_file_path}...")
+    create_output_directories([ output_file_path ])
+    build_page(page, markdown, output_file_path, template, basepath, cache=cache, 
+               skip_unchanged=skip_unchanged)
+    manifest.record(page, inputs, output_file_path)
+
+  manifest.save()
+
+def copy_static(static_path: str,
+                output_path: str,
+                manifest: BuildManifest,
+                compare_content: bool = False,
+                strategy: LinkStrategy = LinkStrategy.COPY) -> None:
+  sync_static(static_path, output_path, manifest, compare_content, strategy)
+
+def remove_stale_outputs(previous_manifest: BuildManifest, manifest: BuildManifest, dest_path: str) -> None:
+  '''Removes the pages of an earlier build that the current one did not write again.'''
+  current_outputs = {entry["output"] for entry in manifest.entries.values()}
+  for entry in previous_manifest.entries.values():
+    if entry["output"] not in current_outputs and remove_file(entry["output"], dest_path):
+      print(f"removing {entry['output']}, its source no longer exists...")
 
 def clear_output_directory(output_path:str) -> None:
   target_path = os.path.join(os.getcwd(), output_path)
@@ -66,16 +380,220 @@ def clear_output_directory(output_path:str) -> None:
     shutil.rmtree(target_path, ignore_errors = False)
     os.makedirs(target_path)
 
+def profile_build(arguments: argparse.Namespace,
+                  from_path: str,
+                  template_path: str,
+                  dest_path: str,
+                  basepath: str,
+                  manifest: BuildManifest,
+                  cache: FragmentCache,
+                  discovery: DirectoryCache) -> None:
+  if arguments.jobs > 1:
+    print("--profile renders pages in a single process, --jobs is ignored")
+
+  profiler = BuildProfiler()
+  code_profile = cProfile.Profile() if arguments.profile_output else None
+
+  with profiler.instrument():
+    if code_profile != None:
+      code_profile.enable()
+    generate_page(from_path, template_path, dest_path, basepath, manifest, 1, profiler, cache,
+                  arguments.stream_threshold, skip_unchanged=arguments.skip_unchanged, shard=arguments.shard,
+                  discovery=discovery)
+    if code_profile != None:
+      code_profile.disable()
+
+  print(profiler.report(arguments.profile_top))
+
+  if code_profile != None:
+    # pstats format, readable by snakeviz, gprof2dot or flameprof
+    code_profile.dump_stats(arguments.profile_output)
+    print(f"cProfile stats written to {arguments.profile_output}")
+
+def rebuild_changed(changed_paths: Set[str],
+                    arguments: argparse.Namespace,
+                    content_directory: str,
+                    static_directory: str,
+                    template_path: str,
+                    output_directory: str,
+                    basepath: str,
+                    manifest: BuildManifest,
+                    static_manifest: BuildManifest,
+                    compress_manifest: BuildManifest,
+                    cache: FragmentCache = None,
+                    discovery: DirectoryCache = None) -> None:
+  '''Brings the output up to date after a watch event, rebuilding only what the changed paths affect.'''
+  changed_paths = {os.path.normpath(path) for path in changed_paths}
+  content_root = os.path.normpath(content_directory)
+  static_root = os.path.normpath(static_directory)
+
+  if any(path == static_root or path.startswith(static_root + os.sep) for path in changed_paths):
+    copy_static(static_directory, output_directory, static_manifest, arguments.checksum,
+                arguments.link_strategy)
+
+  changed_content = [path for path in changed_paths 
+                     if path == content_root or path.startswith(content_root + os.sep)]
+  changed_pages = [os.path.join(content_directory, os.path.relpath(path, content_root))
+                   for path in changed_content if path.endswith(".md")]
+  # a created, moved or deleted directory may hold any number of pages
+  known_pages = [os.path.normpath(page) for page in manifest.entries]
+  changed_directories = [path for path in changed_content 
+                         if os.path.isdir(path) or 
+                            any(page.startswith(path + os.sep) for page in known_pages)]
+
+  # the pages built from a changed markdown file, the template or one of its partials
+  changed_pages.extend(page for page in manifest.dependents(list(changed_paths)) 
+                       if page not in changed_pages)
+
+  if changed_directories:
+    generate_page(content_directory, template_path, output_directory, basepath, manifest,
+                  max(arguments.jobs, 1), cache=cache, stream_threshold=arguments.stream_threshold,
+                  io_concurrency=arguments.io_concurrency, skip_unchanged=arguments.skip_unchanged,
+                  discovery=discovery)
+  elif changed_pages:
+    regenerate_pages(changed_pages, content_directory, template_path, output_directory, 
+                     basepath, manifest, cache, arguments.stream_threshold, arguments.skip_unchanged)
+
+  if arguments.precompress:
+    precompress(output_directory, compress_manifest, max(arguments.jobs, 1))
+  else:
+    remove_stale_compressed(output_directory, compress_manifest)
+
+def parse_arguments() -> argparse.Namespace:
+  parser = argparse.ArgumentParser(description="Generates the static site from ./content into ./docs.")
+  parser.add_argument("basepath", nargs="?", default="/",
+                      help="prefix prepended to root-relative links and images")
+  parser.add_argument("--incremental", action="store_true",
+                      help="only regenerate pages whose markdown, template or basepath changed, "
+                           "and only copy new or changed static files")
+  parser.add_argument("--checksum", action="store_true",
+                      help="compare static files by content when their modification times differ")
+  parser.add_argument("--link-strategy", type=LinkStrategy, default=LinkStrategy.COPY,
+                      choices=list(LinkStrategy),
+                      help="how static files are published, anything unsupported falls back to copy")
+  parser.add_argument("--skip-unchanged", action="store_true",
+                      help="keep ./docs between full builds and leave pages whose content did not change "
+                           "untouched, mtime included")
+  parser.add_argument("--precompress", action="store_true",
+                      help="write .gz siblings of the text assets in ./docs, and .br and .zst ones "
+                           "when brotli and zstandard are installed")
+  parser.add_argument("--no-cache", action="store_true",
+                      help="do not keep rendered page content in ./.fragment_cache for later builds")
+  parser.add_argument("--stream-threshold", type=int, default=STREAM_THRESHOLD, metavar="BYTES",
+                      help="render markdown files of at least this size block by block from the file")
+  parser.add_argument("--io-concurrency", type=int, default=0, metavar="N",
+                      help="read up to N pages ahead and write up to N behind on threads while rendering, "
+                           "for content on slow or network filesystems")
+  parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                      help="render pages across N worker processes")
+  parser.add_argument("--profile", action="store_true",
+                      help="time every page and build stage and print the slowest pages, "
+                           "with the net change of live memory blocks per stage")
+  parser.add_argument("--profile-top", type=int, default=20, metavar="N",
+                      help="pages listed by --profile")
+  parser.add_argument("--profile-output", metavar="FILE",
+                      help="with --profile, also dump cProfile stats of the build to FILE")
+  parser.add_argument("--shard", type=parse_shard, metavar="i/N",
+                      help="only build the i-th of N deterministic slices of the pages, into ./shards/i-of-N")
+  parser.add_argument("--merge-shards", type=int, metavar="N",
+                      help="instead of building pages, publish the N shards in ./shards and the static files "
+                           "into ./docs")
+  parser.add_argument("--serve", action="store_true",
+                      help="serve the output directory after the build")
+  parser.add_argument("--watch", action="store_true",
+                      help="with --serve, rebuild the pages affected by changes to content, static or the template")
+  parser.add_argument("--port", type=int, default=8888,
+                      help="port of the --serve http server")
+
+  arguments = parser.parse_args()
+  if arguments.shard != None and arguments.merge_shards != None:
+    parser.error("--shard and --merge-shards are separate steps of a sharded build")
+
+  return arguments
+
 def main() -> None:
-  basepath: str = sys.argv[1] if sys.argv[1] else "/"
+  arguments = parse_arguments()
+  basepath: str = arguments.basepath if arguments.basepath else "/"
 
   static_directory: str  = "./static"
   output_directory: str = "./docs"
   content_directory: str  = "./content"
   template_path: str = "./template.html"
+  manifest_path: str = "./.build_manifest.json"
+  static_manifest_path: str = "./.static_manifest.json"
+  compress_manifest_path: str = "./.compress_manifest.json"
+  cache_directory: str = "./.fragment_cache"
+  discovery_cache_path: str = "./.discovery_cache.json"
+  shards_directory: str = "./shards"
+  merge_manifest_prefix: str = "./.merge_manifest"
+
+  if arguments.shard != None:
+    # a shard only renders its pages, static files and compression are left to the merge
+    output_directory = shard_directory(shards_directory, *arguments.shard)
+    manifest_path = shard_manifest_path("./.build_manifest", *arguments.shard)
+
+  cache = FragmentCache(cache_directory) if not arguments.no_cache else None
+  previous_manifest = None
+  if arguments.incremental:
+    discovery = DirectoryCache.load(discovery_cache_path)
+    manifest = BuildManifest.load(manifest_path)
+    static_manifest = BuildManifest.load(static_manifest_path)
+    compress_manifest = BuildManifest.load(compress_manifest_path)
+  else:
+    # a full build starts from scratch but still records manifests for the next incremental one
+    discovery = DirectoryCache(discovery_cache_path)
+    manifest = BuildManifest(manifest_path)
+    if arguments.skip_unchanged:
+      # the previous output stays to be compared against, only what the build no longer produces goes
+      previous_manifest = BuildManifest.load(manifest_path)
+      static_manifest = BuildManifest.load(static_manifest_path)
+      compress_manifest = BuildManifest.load(compress_manifest_path)
+    else:
+      clear_output_directory(output_directory)
+      static_manifest = BuildManifest(static_manifest_path)
+      compress_manifest = BuildManifest(compress_manifest_path)
+    if cache != None:
+      cache.clear()
+
+  if arguments.shard == None:
+    copy_static(static_directory, output_directory, static_manifest, arguments.checksum,
+                arguments.link_strategy)
+
+  if arguments.merge_shards != None:
+    print(f"Merging {arguments.merge_shards} shards from {shards_directory} into {output_directory}")
+    merge_shards(shards_directory, arguments.merge_shards, output_directory, merge_manifest_prefix,
+                 arguments.incremental or arguments.skip_unchanged, arguments.checksum, 
+                 arguments.link_strategy, arguments.skip_unchanged)
+  elif arguments.profile:
+    profile_build(arguments, content_directory, template_path, output_directory, basepath, manifest,
+                  cache, discovery)
+  else:
+    generate_page(content_directory, template_path, output_directory, basepath, manifest, 
+                  max(arguments.jobs, 1), cache=cache, stream_threshold=arguments.stream_threshold,
+                  io_concurrency=arguments.io_concurrency, skip_unchanged=arguments.skip_unchanged,
+                  shard=arguments.shard, discovery=discovery)
+
+  # a merge writes no pages of its own, the shard merges remove the ones that are gone
+  if previous_manifest != None and arguments.merge_shards == None:
+    remove_stale_outputs(previous_manifest, manifest, output_directory)
+
+  if arguments.precompress and arguments.shard == None:
+    print(f"Precompressing text assets in {output_directory} as {', '.join(available_encoders())}")
+    precompress(output_directory, compress_manifest, max(arguments.jobs, 1))
+  elif arguments.shard == None:
+    # compressed copies of an earlier --precompress build must not outlive the pages they were made from
+    remove_stale_compressed(output_directory, compress_manifest)
+
+  if not arguments.serve or arguments.shard != None:
+    return
 
-  clear_output_directory(output_directory)
-  copy_static(static_directory, output_directory)
-  generate_page(content_directory, template_path, output_directory, basepath)
+  # partials the template starts including later are only watched after a restart
+  template_files = list(Template.load(template_path, basepath).dependencies)
+  watch_paths = [content_directory, static_directory, *template_files] if arguments.watch else None
+  serve(output_directory, arguments.port, watch_paths, 
+        lambda changed_paths: rebuild_changed(changed_paths, arguments, content_directory, static_directory, 
+                                              template_path, output_directory, basepath, manifest, 
+                                              static_manifest, compress_manifest, cache, discovery))
 
-main()
+if __name__ == "__main__":
+  main()
@@ -1,7 +1,8 @@
+import mmap
 import re
 
 from enum import Enum
-from typing import List
+from typing import Dict, Iterable, Iterator, List
 from htmlnode import HTMLNode
 from leafnode import LeafNode
 from parentnode import ParentNode
@@ -22,40 +23,54 @@ class BlockType(Enum):
   def __str__(self) -> str:
     return str(self.value)
 
+# how much of a memory-mapped file is parsed before its pages are released
+_RELEASE_BYTES = 1024 * 1024
+_HEADING_PATTERN = re.compile(r"^(\#{1,6})\ ")
+_QUOTE_MARKER_PATTERN = re.compile(r"^([>|> ]+)")
 
-class MarkdownParser:
-  def is_quote_block(current_block:List[str]) -> bool:
-    quote_found = False
-    if current_block:
-      quote_found = all(line.startswith(">") for line in current_block)
 
-    return quote_found
-  
-  def is_code_block(current_block:List[str]) -> bool:
-    code_found = False
-    if current_block:
-      code_found = current_block[0].startswith("```")
+class Block:
+  '''A block of markdown lines, typed by the splitter. Level is the heading level, 0 for other kinds.'''
+  __slots__ = ("kind", "lines", "level")
 
-    return code_found
-  
-  def is_heading_block(current_block: List[str]) -> bool:
-    heading_found = False
-    if current_block:
-      heading_found = (len(current_block) == 1 and current_block[0].startswith('#'))
+  def __init__(self, kind: BlockType, lines: List[str], level: int = 0) -> None:
+    self.kind = kind
+    self.lines = lines
+    self.level = level
 
-    return heading_found
-  
-  def is_list_block(current_block: List[str]) -> bool:
-    list_started = False
-    if current_block:
-      list_started = all(line.startswith("*") or line.startswith("-") or line[:1].isdigit() for line in current_block)
+  def text(self) -> str:
+    return "\n".join(self.lines)
+
+  def __eq__(self, other: object) -> bool:
+    if (not isinstance(other, Block)):
+      return False
+
+    return ((self.kind == other.kind) and
+            (self.lines == other.lines) and
+            (self.level == other.level))
+
+  def __repr__(self) -> str:
+    return f"Block({self.kind}, {self.lines}, {self.level})"
+
+
+class Document:
+  '''A parsed markdown document. Title is its first h1, None when it has none.'''
+  __slots__ = ("title", "content", "metadata")
+
+  def __init__(self, title: str | None, content: ParentNode | None, metadata: Dict[str, int]) -> None:
+    self.title = title
+    self.content = content
+    self.metadata = metadata
+
+  def __repr__(self) -> str:
+    return f"Document({self.title}, {self.content}, {self.metadata})"
 
-    return list_started
-  
-  def is_ordered_list_continuation(previous_lines: List[str], current_line:str) -> bool:
-    # Get number of exisiting items
-    item_count = len([l for l in previous_lines if l.strip()])
 
+class MarkdownParser:
+  def is_list_line(line: str) -> bool:
+    return (line.startswith("*") or line.startswith("-") or line[:1].isdigit())
+
+  def is_ordered_list_continuation(item_count: int, current_line:str) -> bool:
     # Next item should be number + 1
     expected_prefix = f"{item_count + 1}. "
     return current_line.startswith(expected_prefix) 
@@ -66,65 +81,111 @@ class MarkdownParser:
   def is_quote_continuation(current_line: str) -> bool:
     return current_line.startswith(">")
 
-  def markdown_to_blocks(markdown: str) -> List[str]:
-    blocks: List[str] = []
+  def _typed_block(lines: List[str], in_code: bool, in_list: bool, in_quote: bool,
+                   unordered: bool, ordered: bool) -> Block:
+    # The splitter only lets a line join a block when it continues the kind of its first
+    # line, so that kind and the list flags tracked while appending decide the type.
+    if in_code and lines[-1].endswith("```"):
+      return Block(BlockType.CODE, lines)
+    elif in_quote:
+      return Block(BlockType.QUOTE, lines)
+    elif in_list:
+      if unordered:
+        return Block(BlockType.UNORDERED_LIST, lines)
+      elif ordered:
+        return Block(BlockType.ORDERED_LIST, lines)
+      return Block(BlockType.PARAGRAPH, lines)
+    elif in_code or len(lines) > 1:
+      # an unclosed code block runs to the end of the document, it is rare enough to classify the slow way
+      return Block(MarkdownParser.block_to_block_type("\n".join(lines)), lines)
+
+    line = lines[0]
+    matches = _HEADING_PATTERN.match(line)
+    if matches:
+      return Block(BlockType.HEADING, lines, len(matches[1]))
+
+    if line.lstrip()[:1] in ("!", "["):
+      return Block(MarkdownParser.block_to_block_type(line), lines)
+    # also the blank blocks left behind by a quote, markdown_to_html_node drops those
+    return Block(BlockType.PARAGRAPH, lines)
+
+  def iter_typed_blocks(lines: Iterable[str]) -> Iterator[Block]:
+    '''Yields the blocks of the markdown lines as soon as each one is complete.'''
     current_block: List[str] = []
+
+    # The kind of the current block is decided by its first line, a later line is only
+    # appended when it continues that kind. Keeping it as running state means every line
+    # is looked at once, instead of re-checking the whole block for each new line.
+    in_code = False
+    in_list = False
+    in_quote = False
+    # whether every line of the current list block is an unordered or a numbered item
+    unordered = False
+    ordered = False
   
-    for line in markdown.splitlines():
+    for line in lines:
       if isEmptyOrWhitespaces(line): 
-        if MarkdownParser.is_quote_block(current_block):
-          blocks.append("\n".join(current_block))
+        if in_quote:
+          yield MarkdownParser._typed_block(current_block, in_code, in_list, in_quote, 
+                                              unordered, ordered)
           current_block = []
-        elif not MarkdownParser.is_code_block(current_block):
+          in_quote = False
+        elif not in_code:
           # Don't split block if next non-empty line contunues a list
           continue
       
-      if MarkdownParser.is_code_block(current_block):
+      if in_code:
         current_block.append(line)
 
         if line.endswith("```"):
-          blocks.append("\n".join(current_block))
+          yield MarkdownParser._typed_block(current_block, in_code, in_list, in_quote, 
+                                              unordered, ordered)
           current_block = []
-        
-      elif line.startswith('#') and MarkdownParser.is_heading_block(current_block):
-        blocks.append("\n".join(current_block))
-        current_block = [ line ]
+          in_code = False
+
+      # If we're in a list block and this line continues it, every line of a list block 
+      # holds one item, so the block length is the number of the last item
+      elif in_list and (MarkdownParser.is_ordered_list_continuation(len(current_block), line) or
+                        MarkdownParser.is_unordered_list_continuation(line)):
+        unordered = unordered and (line.startswith("* ") or line.startswith("- "))
+        ordered = ordered and line.startswith(f"{len(current_block) + 1}. ")
+        current_block.append(line)
 
-      # If we're in a list block and this line continues it
-      elif current_block and MarkdownParser.is_list_block(current_block):
-        if MarkdownParser.is_ordered_list_continuation(current_block, line) or \
-           MarkdownParser.is_unordered_list_continuation(line):
-          current_block.append(line)
-        else:
-          # Starts a new block
-          blocks.append("\n".join(current_block))
-          current_block = [ line ]
-      
-      elif current_block and MarkdownParser.is_quote_block(current_block):
-        if MarkdownParser.is_quote_continuation(line):
-          current_block.append(line)
-        else:
-          blocks.append("\n".join(current_block))
-          current_block = [ line ]
+      elif in_quote and MarkdownParser.is_quote_continuation(line):
+        current_block.append(line)
       
       else:
-          if current_block:
-            blocks.append("\n".join(current_block))
-          
-          current_block = [ line ]
+        # Starts a new block, headings always end up alone in theirs
+        if current_block:
+          yield MarkdownParser._typed_block(current_block, in_code, in_list, in_quote, 
+                                              unordered, ordered)
 
-    # append the remaining content
+        current_block = [ line ]
+        in_code = line.startswith("```")
+        in_list = MarkdownParser.is_list_line(line)
+        in_quote = line.startswith(">")
+        unordered = line.startswith("* ") or line.startswith("- ")
+        ordered = line.startswith("1. ")
+
+    # yield the remaining content
     if current_block:
-      blocks.append("\n".join(current_block))
-    
-    return blocks
+      yield MarkdownParser._typed_block(current_block, in_code, in_list, in_quote, 
+                                          unordered, ordered)
+
+  def lines_to_typed_blocks(lines: Iterable[str]) -> List[Block]:
+    return list(MarkdownParser.iter_typed_blocks(lines))
+
+  def markdown_to_typed_blocks(markdown: str) -> List[Block]:
+    return MarkdownParser.lines_to_typed_blocks(markdown.splitlines())
+
+  def markdown_to_blocks(markdown: str) -> List[str]:
+    return [block.text() for block in MarkdownParser.markdown_to_typed_blocks(markdown)]
 
   def block_to_block_type(block: str) -> BlockType:
-    heading_pattern = r"^\#{1,6}\ "
     lines = block.splitlines()
     stripped_block = block.strip()
 
-    if(re.search(heading_pattern, block)):
+    if(_HEADING_PATTERN.match(block)):
       return BlockType.HEADING
     elif(block.startswith("```") and block.endswith("```")):
       return BlockType.CODE
@@ -141,119 +202,163 @@ class MarkdownParser:
     else:
       return BlockType.PARAGRAPH
     
-  def text_to_children(block: str) -> List[HTMLNode]:
+  def text_to_children(block: str, basepath: str = "/") -> List[HTMLNode]:
     children_as_text_nodes: List[TextNode] = TextNode.text_to_textnodes(block)
-    html_nodes: List[HTMLNode] = [textNode.to_leafnode() for textNode in children_as_text_nodes]
+    html_nodes: List[HTMLNode] = [textNode.to_leafnode(basepath) for textNode in children_as_text_nodes]
 
     return html_nodes      
 
-  def markdown_to_html_node(markdown: str) -> ParentNode:
-    if isEmptyOrWhitespaces(markdown):
-      return 
-    
-    blocks = MarkdownParser.markdown_to_blocks(markdown)
+  def block_to_html_nodes(block: Block, basepath: str = "/") -> List[HTMLNode]:
     html_nodes: List[HTMLNode] = []
 
-    for block in blocks:
-      if isEmptyOrWhitespaces(block):
-        continue
-
-      block_type = MarkdownParser.block_to_block_type(block)
+    match block.kind:
+      case BlockType.CODE:
+        code_node = ParentNode("code", [LeafNode(block.text().strip("```"))])
+        html_nodes.append(ParentNode("pre", [ code_node ]))
 
-      match block_type:
-        case BlockType.CODE:
-          code_node = ParentNode("code", [LeafNode(block.strip("```"))])
-          html_nodes.append(ParentNode("pre", [ code_node ]))
+      case BlockType.HEADING:
+        html_nodes.append(ParentNode(f'h{block.level}', 
+                                     MarkdownParser.text_to_children(block.lines[0].lstrip("#").strip(), 
+                                                                     basepath)))
 
-        case BlockType.HEADING:
-          heading_pattern = r"^(\#{1,6})\ ?"
-          matches = re.match(heading_pattern, block)
-          heading_level = matches[0].count("#") if matches else 0
+      case BlockType.IMAGE:
+        for node in MarkdownParser.text_to_children(block.lines[0], basepath):
+          html_nodes.append(node)
+        
+      case BlockType.LINK:
+        for node in MarkdownParser.text_to_children(block.lines[0], basepath):
+          html_nodes.append(node)
+
+      case BlockType.ORDERED_LIST:
+        li_nodes = [
+          ParentNode('li',
+                     MarkdownParser.text_to_children(line.strip().lstrip("0123456789.").strip(), basepath))
+          for line in block.lines]
+        html_nodes.append(ParentNode("ol",
+                                     li_nodes))
+
+      case BlockType.PARAGRAPH:
+        if isEmptyOrWhitespaces(block.lines[0]):
+          return html_nodes
+
+        html_nodes.append(ParentNode('p', 
+                                     MarkdownParser.text_to_children(block.text(), basepath)))
+        
+      case BlockType.QUOTE:
+        current_level = 0
 
-          html_nodes.append(ParentNode(f'h{heading_level}', 
-                                       MarkdownParser.text_to_children(block.lstrip("#").strip())))
+        quotes: List[ParentNode] = []
+        text_at_current_level: str = ""
 
-        case BlockType.IMAGE:
-          for node in MarkdownParser.text_to_children(block):
-            html_nodes.append(node)
+        for line in block.lines:
+          matches = _QUOTE_MARKER_PATTERN.match(line)
+          line_level = matches[0].count(">") if matches else 0
           
-        case BlockType.LINK:
-          for node in MarkdownParser.text_to_children(block):
-            html_nodes.append(node)
-
-        case BlockType.ORDERED_LIST:
-          li_nodes = [
-            ParentNode('li',
-                       MarkdownParser.text_to_children(line.strip().lstrip("0123456789.").strip()))
-            for line in block.splitlines()
-            if line.strip()]
-          html_nodes.append(ParentNode("ol",
-                                       li_nodes))
-
-        case BlockType.PARAGRAPH:
-          html_nodes.append(ParentNode('p', 
-                                       MarkdownParser.text_to_children(block)))
+          if line_level != 0:
+            if line_level > current_level:
+              if text_at_current_level:
+                children = MarkdownParser.text_to_children(text_at_current_level, basepath)
+                for child in children:
+                  quotes[-1].append_child(child)
+
+              quotes.append(ParentNode("blockquote", []))
+              text_at_current_level = line[len(matches[0]):].strip()
+              current_level = line_level
+
+            elif line_level < current_level:
+              if text_at_current_level:
+                children = MarkdownParser.text_to_children(text_at_current_level, basepath)
+                for child in children:
+                  quotes[-1].append_child(child)
+                
+              while (current_level - line_level > 0):               
+                child_blockquote = quotes.pop()
+                quotes[-1].append_child(child_blockquote)
+                current_level -= 1
+
+              text_at_current_level = line[len(matches[0]):].strip()
+
+            elif line_level == current_level:
+              text_at_current_level += "\n" + line[len(matches[0]):].strip()                
+       
+        if text_at_current_level:
+          children = MarkdownParser.text_to_children(text_at_current_level, basepath)
+          for child in children:
+            quotes[-1].append_child(child)
           
-        case BlockType.QUOTE:
-          pattern_for_marker = r"^([>|> ]+)"
-          current_level = 0
-
-          quotes: List[ParentNode] = []
-          text_at_current_level: str = ""
-
-          for line in block.splitlines():
-            matches = re.match(pattern_for_marker, line)
-            line_level = matches[0].count(">") if matches else 0
-            
-            if line_level != 0:
-              if line_level > current_level:
-                if text_at_current_level:
-                  children = MarkdownParser.text_to_children(text_at_current_level)
-                  for child in children:
-                    quotes[-1].append_child(child)
-
-                quotes.append(ParentNode("blockquote", []))
-                text_at_current_level = line[len(matches[0]):].strip()
-                current_level = line_level
-
-              elif line_level < current_level:
-                if text_at_current_level:
-                  children = MarkdownParser.text_to_children(text_at_current_level)
-                  for child in children:
-                    quotes[-1].append_child(child)
-                  
-                while (current_level - line_level > 0):               
-                  child_blockquote = quotes.pop()
-                  quotes[-1].append_child(child_blockquote)
-                  current_level -= 1
-
-                text_at_current_level = line[len(matches[0]):].strip()
-
-              elif line_level == current_level:
-                text_at_current_level += "\n" + line[len(matches[0]):].strip()                
-         
-          if text_at_current_level:
-            children = MarkdownParser.text_to_children(text_at_current_level)
-            for child in children:
-              quotes[-1].append_child(child)
-            
-          html_nodes.append(quotes[0])
-
-        case BlockType.UNORDERED_LIST:
-          li_nodes = [
-            ParentNode('li',
-                       MarkdownParser.text_to_children(line.strip().lstrip("*-").strip()))
-            for line in block.splitlines()
-            if line.strip()]
-
-          html_nodes.append(ParentNode('ul',
-                                       li_nodes))
+        html_nodes.append(quotes[0])
 
-          
-    return ParentNode("div", html_nodes)
+      case BlockType.UNORDERED_LIST:
+        li_nodes = [
+          ParentNode('li',
+                     MarkdownParser.text_to_children(line.strip().lstrip("*-").strip(), basepath))
+          for line in block.lines]
 
-  def extract_title(markdown: str) -> str:
-    lines = markdown.splitlines()
+        html_nodes.append(ParentNode('ul',
+                                     li_nodes))
+
+    return html_nodes
+
+  def iter_html_nodes(lines: Iterable[str], basepath: str = "/") -> Iterator[HTMLNode]:
+    '''Yields the html nodes of the markdown lines block by block, only one block is held at a time.'''
+    for block in MarkdownParser.iter_typed_blocks(lines):
+      yield from MarkdownParser.block_to_html_nodes(block, basepath)
+
+  def _capture_title(lines: Iterable[str], document: Document) -> Iterator[str]:
+    # same rule as extract_title, checked on the lines as the block parse consumes them
+    line_count = 0
+    for line in lines:
+      if document.title == None and line[:1] == "#" and line[1:2] != "#":
+        document.title = line[1:].strip()
+      line_count += 1
+      yield line
+
+    document.metadata["lines"] = line_count
+
+  def parse_document(markdown: str, basepath: str = "/") -> Document:
+    '''Parses the content node, the title and the line and block counts in one pass over the lines.'''
+    document = Document(None, None, {})
+    if isEmptyOrWhitespaces(markdown):
+      return document
+
+    blocks = MarkdownParser.lines_to_typed_blocks(MarkdownParser._capture_title(markdown.splitlines(), 
+                                                                                document))
+    html_nodes: List[HTMLNode] = []
+    for block in blocks:
+      html_nodes.extend(MarkdownParser.block_to_html_nodes(block, basepath))
+
+    document.content = ParentNode("div", html_nodes)
+    document.metadata["blocks"] = len(blocks)
+
+    return document
+
+  def markdown_to_html_node(markdown: str, basepath: str = "/") -> ParentNode:
+    return MarkdownParser.parse_document(markdown, basepath).content
+
+  def read_mapped_lines(buffer: mmap.mmap) -> Iterator[str]:
+    '''Lines of a memory-mapped markdown file without their line endings, each decoded once reached.'''
+    released = 0
+    for line in iter(buffer.readline, b""):
+      yield line.decode("utf-8").rstrip("\r\n")
+
+      # parsed pages of the file are dropped from memory, the kernel reads them again if ever needed
+      position = buffer.tell()
+      if hasattr(mmap, "MADV_DONTNEED") and position - released >= _RELEASE_BYTES:
+        # only the range parsed since the last release, so the advised total stays linear in the file size
+        release_end = position - position % mmap.PAGESIZE
+        buffer.madvise(mmap.MADV_DONTNEED, released, release_end - released)
+        released = release_end
+
+  def extract_title_from_buffer(buffer: mmap.mmap) -> str:
+    '''extract_title for a memory-mapped file, searched in place without decoding the lines before it.'''
+    # the \s? of extract_title_from_lines is left to strip, in bytes it would match the line ending
+    matches = re.search(rb"^#(?!#)(.*)$", buffer, re.MULTILINE)
+    if not matches:
+      raise Exception("Header markup not found.")
+
+    return matches[1].decode("utf-8").strip()
+
+  def extract_title_from_lines(lines: Iterable[str]) -> str:
     h1_markdown_patter: str = r"^#(?!#)\s?"
 
     for line in lines:
@@ -262,4 +367,7 @@ class MarkdownParser:
       if matches:
         return line[len(matches[0]):].strip()
       
-    raise Exception("Header markup not found.")
\ No newline at end of file
+    raise Exception("Header markup not found.")
+
+  def extract_title(markdown: str) -> str:
+    return MarkdownParser.extract_title_from_lines(markdown.splitlines())
@@ -1,9 +1,12 @@
-from typing import Dict, List
+import io
+from typing import Dict, List, TextIO
 from htmlnode import HTMLNode
 from leafnode import LeafNode
 
 
 class ParentNode(HTMLNode):
+  __slots__ = ()
+
   def __init__(self, 
                tag: str, 
                children: List[HTMLNode], 
@@ -17,19 +20,20 @@ class ParentNode(HTMLNode):
     return f"ParentNode({self.tag}, {self.children}, {self.props})"
    
   def to_html(self) -> str:
+    buffer = io.StringIO()
+    self.write_html(buffer)
+
+    return buffer.getvalue()
 
+  def write_html(self, sink: TextIO) -> None:
     if(self.tag == None):
       raise ValueError("all parent nodes must have a tag")
     
     if(self.children == None):
       raise ValueError(f"a parent node must have at lease 1 child, current node: {self}")
-    
-    children_html = "" 
-    for child in self.children:
-      children_html = children_html + child.to_html()
-
-    props_html: str = self.props_to_html()
-    if(len(props_html) > 0):
-      props_html = f" {props_html}"
 
-    return f"<{self.tag}{props_html}>{children_html}</{self.tag}>"
\ No newline at end of file
+    # children write straight into the sink, so no level copies the html of its subtree
+    sink.write(f"<{self.tag}{self.attributes_html()}>")
+    for child in self.children:
+      child.write_html(sink)
+    sink.write(f"</{self.tag}>")
\ No newline at end of file
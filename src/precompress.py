@@ -0,0 +1,117 @@
+import gzip
+import multiprocessing
+import os
+from typing import Callable, Dict, List, Tuple
+
+from build_manifest import BuildManifest
+from utilities import open_atomic, remove_file
+
+try:
+  import brotli
+except ImportError:
+  brotli = None
+
+try:
+  import zstandard
+except ImportError:
+  zstandard = None
+
+# assets a web server would otherwise compress on every request, images are compressed already
+TEXT_EXTENSIONS = [".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt", ".map"]
+# below this the compression headers eat most of the savings
+MIN_SIZE = 256
+
+
+def _gzip(content: bytes) -> bytes:
+  # a fixed mtime keeps the .gz of unchanged content byte-identical between builds
+  return gzip.compress(content, compresslevel=9, mtime=0)
+
+def _brotli(content: bytes) -> bytes:
+  return brotli.compress(content, quality=11)
+
+def _zstd(content: bytes) -> bytes:
+  return zstandard.ZstdCompressor(level=19).compress(content)
+
+def available_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+  '''Compressed file extension -> encoder, .br and .zst only when their library is installed.'''
+  encoders = { ".gz": _gzip }
+  if brotli != None:
+    encoders[".br"] = _brotli
+  if zstandard != None:
+    encoders[".zst"] = _zstd
+
+  return encoders
+
+def _compress_file(job: Tuple[str, str]) -> str:
+  source_path, extension = job
+  with open(source_path, "rb") as source_file:
+    content = source_file.read()
+
+  compressed_path = f"{source_path}{extension}"
+  with open_atomic(compressed_path, mode="wb") as compressed_file:
+    compressed_file.write(available_encoders()[extension](content))
+
+  return compressed_path
+
+def compressible_files(directory: str) -> List[str]:
+  files: List[str] = []
+  for root, dirs, names in os.walk(directory):
+    for name in names:
+      path = os.path.join(root, name)
+      if os.path.splitext(name)[1] in TEXT_EXTENSIONS and os.path.getsize(path) >= MIN_SIZE:
+        files.append(path)
+
+  return files
+
+def precompress(directory: str, manifest: BuildManifest, jobs: int = 1) -> None:
+  '''Writes a compressed sibling per available encoding next to every text asset of directory.
+
+  A sibling is only compressed again when the hash of its source changed, siblings of
+  removed or no longer compressible files are deleted.'''
+  encoders = available_encoders()
+  compressed_paths: List[str] = []
+  jobs_to_run: List[Tuple[str, str]] = []
+  source_hashes: Dict[str, Dict[str, str]] = {}
+
+  for source_path in compressible_files(directory):
+    inputs = { "source": BuildManifest.hash_file(source_path) }
+    for extension in encoders:
+      compressed_path = f"{source_path}{extension}"
+      compressed_paths.append(compressed_path)
+      if not manifest.is_up_to_date(compressed_path, inputs, compressed_path):
+        jobs_to_run.append((source_path, extension))
+        source_hashes[compressed_path] = inputs
+
+  if jobs > 1 and len(jobs_to_run) > 1:
+    # zlib, brotli and zstd are all cpu bound, every worker compresses whole files
+    with multiprocessing.Pool(jobs) as pool:
+      compressed = list(pool.imap_unordered(_compress_file, jobs_to_run, chunksize=4))
+  else:
+    compressed = [_compress_file(job) for job in jobs_to_run]
+
+  for compressed_path in compressed:
+    manifest.record(compressed_path, source_hashes[compressed_path], compressed_path)
+
+  for removed_path in manifest.removed_sources(compressed_paths):
+    manifest.forget(removed_path)
+    remove_file(removed_path, directory)
+
+  manifest.save()
+
+def remove_stale_compressed(directory: str, manifest: BuildManifest) -> None:
+  '''Removes the compressed siblings whose source changed or is gone, for builds without --precompress.
+
+  A server set up to prefer them, e.g. nginx gzip_static, would otherwise keep serving the old page.'''
+  if not manifest.entries and not os.path.exists(manifest.path):
+    return
+
+  for compressed_path, entry in list(manifest.entries.items()):
+    source_path = os.path.splitext(compressed_path)[0]
+    if (os.path.exists(source_path) and 
+        entry["inputs"] == { "source": BuildManifest.hash_file(source_path) }):
+      continue
+
+    manifest.forget(compressed_path)
+    remove_file(compressed_path, directory)
+
+  manifest.save()
@@ -0,0 +1,56 @@
+import argparse
+import hashlib
+import os
+from typing import List, Tuple
+
+from build_manifest import BuildManifest
+from content_discovery import ContentPage
+from static_sync import LinkStrategy, sync_static
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+  '''Parses "i/N", the 1-based index of a shard and the number of shards.'''
+  try:
+    index, count = (int(part) for part in text.split("/"))
+  except ValueError:
+    raise argparse.ArgumentTypeError(f"{text} is not a shard, expected i/N, e.g. 2/8")
+
+  if count < 1 or not 1 <= index <= count:
+    raise argparse.ArgumentTypeError(f"shard {text} is out of range, i has to be between 1 and N")
+
+  return index, count
+
+def shard_of(relative_path: str, count: int) -> int:
+  '''The 1-based shard a page belongs to, the same on every machine for the same content path.'''
+  digest = hashlib.sha256(relative_path.replace(os.sep, "/").encode("utf-8")).digest()
+
+  return int.from_bytes(digest[:8], "big") % count + 1
+
+def pages_in_shard(pages: List[ContentPage], shard: Tuple[int, int]) -> List[ContentPage]:
+  index, count = shard
+  return [page for page in pages if shard_of(page.relative_path, count) == index]
+
+def shard_directory(shards_path: str, index: int, count: int) -> str:
+  return os.path.join(shards_path, f"{index}-of-{count}")
+
+def shard_manifest_path(prefix: str, index: int, count: int) -> str:
+  return f"{prefix}.shard-{index}-of-{count}.json"
+
+def merge_shards(shards_path: str,
+                 count: int,
+                 dest_path: str,
+                 manifest_prefix: str,
+                 incremental: bool = False,
+                 compare_content: bool = False,
+                 strategy: LinkStrategy = LinkStrategy.COPY,
+                 skip_unchanged: bool = False) -> None:
+  '''Publishes the pages of all count shards into dest_path, a missing shard fails the merge.
+
+  Every shard is synced with its own manifest, so a page that left a shard is removed
+  without touching what the other shards or the static files published. Shards are built
+  fresh, so with skip_unchanged the pages are compared by content, not modification time.'''
+  for index in range(1, count + 1):
+    manifest_path = shard_manifest_path(manifest_prefix, index, count)
+    manifest = BuildManifest.load(manifest_path) if incremental else BuildManifest(manifest_path)
+    sync_static(shard_directory(shards_path, index, count), dest_path, manifest, compare_content, strategy,
+                skip_unchanged)
@@ -0,0 +1,146 @@
+import os
+import shutil
+from enum import Enum
+from typing import List
+
+from build_manifest import BuildManifest
+from utilities import remove_file
+
+# linux ioctl cloning a whole file (FICLONE), supported on btrfs, xfs and the like
+_FICLONE = 0x40049409
+
+
+class LinkStrategy(Enum):
+  COPY = "copy"
+  HARDLINK = "hardlink"
+  REFLINK = "reflink"
+  COPY_FILE_RANGE = "copy_file_range"
+  SENDFILE = "sendfile"
+
+  def __str__(self) -> str:
+    return str(self.value)
+
+
+def _hardlink(source_path: str, target_path: str) -> None:
+  if os.path.lexists(target_path):
+    os.remove(target_path)
+
+  os.link(source_path, target_path)
+
+def _reflink(source_path: str, target_path: str) -> None:
+  import fcntl
+
+  with open(source_path, "rb") as source_file, open(target_path, "wb") as target_file:
+    fcntl.ioctl(target_file.fileno(), _FICLONE, source_file.fileno())
+
+def _copy_file_range(source_path: str, target_path: str) -> None:
+  with open(source_path, "rb") as source_file, open(target_path, "wb") as target_file:
+    remaining = os.fstat(source_file.fileno()).st_size
+    while remaining > 0:
+      copied = os.copy_file_range(source_file.fileno(), target_file.fileno(), remaining)
+      if copied == 0:
+        # unsupported by the filesystem or a source truncated midway, publish_file falls back to copy2
+        raise OSError(f"copy_file_range stopped with {remaining} bytes of {source_path} left")
+      remaining -= copied
+
+def _sendfile(source_path: str, target_path: str) -> None:
+  with open(source_path, "rb") as source_file, open(target_path, "wb") as target_file:
+    size = os.fstat(source_file.fileno()).st_size
+    offset = 0
+    while offset < size:
+      sent = os.sendfile(target_file.fileno(), source_file.fileno(), offset, size - offset)
+      if sent == 0:
+        raise OSError(f"sendfile stopped at byte {offset} of {size} of {source_path}")
+      offset += sent
+
+def publish_file(source_path: str, target_path: str, strategy: LinkStrategy = LinkStrategy.COPY) -> None:
+  '''Publishes source_path at target_path, falling back to a plain copy when the strategy is unsupported.'''
+  try:
+    match strategy:
+      case LinkStrategy.HARDLINK:
+        _hardlink(source_path, target_path)
+        return
+      case LinkStrategy.REFLINK:
+        _reflink(source_path, target_path)
+      case LinkStrategy.COPY_FILE_RANGE:
+        _copy_file_range(source_path, target_path)
+      case LinkStrategy.SENDFILE:
+        _sendfile(source_path, target_path)
+      case _:
+        shutil.copy2(source_path, target_path)
+        return
+
+    # keep the source modification time, the next sync compares against it
+    shutil.copystat(source_path, target_path)
+  except (OSError, AttributeError, ImportError):
+    # other filesystem or volume, or a platform without the syscall
+    shutil.copy2(source_path, target_path)
+
+
+def is_unchanged(source_path: str, 
+                 target_path: str, 
+                 compare_content: bool = False, 
+                 keep_unchanged: bool = False) -> bool:
+  '''Whether target_path already holds source_path, keep_unchanged compares the bytes of the two
+  and leaves an identical target untouched, modification time included.'''
+  if not os.path.exists(target_path):
+    return False
+
+  source_stat = os.stat(source_path)
+  target_stat = os.stat(target_path)
+
+  if source_stat.st_size != target_stat.st_size:
+    return False
+
+  # copies are made with copy2, so an untouched asset keeps the modification time of its source
+  if source_stat.st_mtime_ns == target_stat.st_mtime_ns:
+    return True
+
+  if not compare_content and not keep_unchanged:
+    return False
+
+  if BuildManifest.hash_file(source_path) != BuildManifest.hash_file(target_path):
+    return False
+
+  # rsync and cdn caches only see a change when the modification time moves
+  if keep_unchanged:
+    return True
+
+  # same bytes, only the timestamp moved (e.g. a fresh checkout), adopt the one of the source
+  shutil.copystat(source_path, target_path)
+  return True
+
+def sync_static(source: str,
+                target: str,
+                manifest: BuildManifest,
+                compare_content: bool = False,
+                strategy: LinkStrategy = LinkStrategy.COPY,
+                keep_unchanged: bool = False) -> None:
+  '''Copies new or changed files from source to target and removes the ones whose source is gone.'''
+  if not os.path.exists(source):
+    raise Exception(f"source path {source}, does not exists.")
+
+  published_files: List[str] = []
+  for root, dirs, files in os.walk(source):
+    for file in files:
+      source_path = os.path.join(root, file)
+      target_path = os.path.join(target, os.path.relpath(source_path, source))
+      published_files.append(source_path)
+
+      if not is_unchanged(source_path, target_path, compare_content, keep_unchanged):
+        print(f"copying {source_path} to destination {os.path.dirname(target_path)}...")
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        publish_file(source_path, target_path, strategy)
+
+      source_stat = os.stat(source_path)
+      manifest.record(source_path,
+                      { "size": source_stat.st_size, "mtime": source_stat.st_mtime_ns },
+                      target_path)
+
+  # only files this sync published are ever removed, generated pages share the target
+  for removed_file in manifest.removed_sources(published_files):
+    removed_target = manifest.forget(removed_file)
+    if remove_file(removed_target, target):
+      print(f"removing {removed_target}, its source no longer exists...")
+
+  manifest.save()
@@ -0,0 +1,89 @@
+import os
+import re
+from typing import Dict, List, TextIO
+from typing_extensions import Self
+
+from htmlnode import HTMLNode
+
+_PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+# {{> partials/header.html }}, the path is relative to the file holding the include
+_INCLUDE_PATTERN = re.compile(r"\{\{>\s*([^\s}]+)\s*\}\}")
+
+
+class Template:
+  '''A page template parsed once into literal segments and {{ Name }} placeholder slots.
+
+  {{> path }} includes are replaced by the partial at path before the placeholders are parsed.'''
+
+  def __init__(self, source: str, basepath: str = "/", path: str = None) -> None:
+    self.source = source
+    self.basepath = basepath
+    self.path = path
+    # every file the template was built from, itself first, mapped to the source read from it
+    self.dependencies: Dict[str, str] = { path: source } if path != None else {}
+    # even indices hold literals, odd indices hold placeholder names
+    self.segments: List[str] = []
+
+    directory = os.path.dirname(path) if path != None else "."
+    expanded_source = self._expand_includes(source, directory, [ path ] if path != None else [])
+
+    position = 0
+    for match in _PLACEHOLDER_PATTERN.finditer(expanded_source):
+      self.segments.append(Template._prefix_literal(expanded_source[position:match.start()], basepath))
+      self.segments.append(match[1])
+      position = match.end()
+
+    self.segments.append(Template._prefix_literal(expanded_source[position:], basepath))
+
+  def load(path: str, basepath: str = "/") -> Self:
+    template_file = open(path, "r")
+    source = template_file.read()
+    template_file.close()
+
+    return Template(source, basepath, path)
+
+  def _expand_includes(self, source: str, directory: str, including: List[str]) -> str:
+    def include(match: re.Match) -> str:
+      partial_path = os.path.join(directory, match[1])
+      if partial_path in including:
+        raise ValueError(f"{partial_path} includes itself")
+
+      partial_file = open(partial_path, "r")
+      partial_source = partial_file.read()
+      partial_file.close()
+
+      self.dependencies[partial_path] = partial_source
+      return self._expand_includes(partial_source, os.path.dirname(partial_path), including + [ partial_path ])
+
+    return _INCLUDE_PATTERN.sub(include, source)
+
+  def _prefix_literal(literal: str, basepath: str) -> str:
+    return literal.replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
+
+  def placeholders(self) -> List[str]:
+    return self.segments[1::2]
+
+  def _pieces(self, values: Dict[str, str | HTMLNode]) -> List[str | HTMLNode]:
+    pieces = []
+    for index, segment in enumerate(self.segments):
+      if index % 2 == 0:
+        pieces.append(segment)
+      elif segment in values:
+        pieces.append(values[segment])
+      else:
+        # unknown placeholders are left in the page untouched
+        pieces.append(f"{{{{ {segment} }}}}")
+
+    return pieces
+
+  def render(self, values: Dict[str, str | HTMLNode]) -> str:
+    return "".join(piece.to_html() if isinstance(piece, HTMLNode) else piece
+                   for piece in self._pieces(values))
+
+  def write(self, sink: TextIO, values: Dict[str, str | HTMLNode]) -> None:
+    '''Writes the page into a file-like sink, node values are serialized straight into it.'''
+    for piece in self._pieces(values):
+      if isinstance(piece, HTMLNode):
+        piece.write_html(sink)
+      else:
+        sink.write(piece)
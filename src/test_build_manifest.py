@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest
+
+
+class BuildManifestTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.manifest_path = os.path.join(self.directory.name, "manifest.json")
+    self.output_path = os.path.join(self.directory.name, "index.html")
+    self.inputs = { "markdown": "abc", "template": "def", "basepath": "/" }
+
+    with open(self.output_path, "w") as output_file:
+      output_file.write("<html></html>")
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def test_hash_content_str_and_bytes(self):
+    expected = BuildManifest.hash_content(b"# Title")
+    actual = BuildManifest.hash_content("# Title")
+
+    self.assertEqual(expected, actual)
+
+  def test_is_up_to_date_unknown_source(self):
+    manifest = BuildManifest(self.manifest_path)
+
+    self.assertFalse(manifest.is_up_to_date("index.md", self.inputs, self.output_path))
+
+  def test_is_up_to_date_recorded_source(self):
+    manifest = BuildManifest(self.manifest_path)
+    manifest.record("index.md", self.inputs, self.output_path)
+
+    self.assertTrue(manifest.is_up_to_date("index.md", dict(self.inputs), self.output_path))
+
+  def test_is_up_to_date_changed_input(self):
+    manifest = BuildManifest(self.manifest_path)
+    manifest.record("index.md", self.inputs, self.output_path)
+    changed_inputs = dict(self.inputs, basepath="/blog/")
+
+    self.assertFalse(manifest.is_up_to_date("index.md", changed_inputs, self.output_path))
+
+  def test_is_up_to_date_missing_output(self):
+    manifest = BuildManifest(self.manifest_path)
+    manifest.record("index.md", self.inputs, self.output_path)
+    os.remove(self.output_path)
+
+    self.assertFalse(manifest.is_up_to_date("index.md", self.inputs, self.output_path))
+
+  def test_save_and_load(self):
+    manifest = BuildManifest(self.manifest_path)
+    manifest.record("index.md", self.inputs, self.output_path)
+    manifest.save()
+
+    expected = manifest.entries
+    actual = BuildManifest.load(self.manifest_path).entries
+
+    self.assertEqual(expected, actual)
+
+  def test_load_missing_manifest(self):
+    expected = {}
+    actual = BuildManifest.load(self.manifest_path).entries
+
+    self.assertEqual(expected, actual)
+
+  def test_load_corrupted_manifest(self):
+    with open(self.manifest_path, "w") as manifest_file:
+      manifest_file.write("{ not json")
+
+    expected = {}
+    actual = BuildManifest.load(self.manifest_path).entries
+
+    self.assertEqual(expected, actual)
+
+  def test_removed_sources(self):
+    manifest = BuildManifest(self.manifest_path)
+    manifest.record("index.md", self.inputs, self.output_path)
+    manifest.record("blog/index.md", self.inputs, "blog/index.html")
+
+    expected = ["blog/index.md"]
+    actual = manifest.removed_sources(["index.md"])
+
+    self.assertEqual(expected, actual)
+
+  def test_dependents(self):
+    manifest = BuildManifest(self.manifest_path)
+    manifest.record("index.md", 
+                    { "files": { "index.md": "a", "./template.html": "b", "partials/footer.html": "c" } }, 
+                    self.output_path)
+    manifest.record("blog/index.md", 
+                    { "files": { "blog/index.md": "d", "./template.html": "b" } }, 
+                    "blog/index.html")
+    manifest.record("static.css", { "size": 1 }, "static.css")
+
+    self.assertEqual(["index.md"], manifest.dependents(["./partials/footer.html"]))
+    self.assertEqual(["index.md", "blog/index.md"], manifest.dependents(["template.html"]))
+    self.assertEqual(["blog/index.md"], manifest.dependents(["blog/index.md", "static.css"]))
+
+  def test_forget(self):
+    manifest = BuildManifest(self.manifest_path)
+    manifest.record("index.md", self.inputs, self.output_path)
+
+    expected = self.output_path
+    actual = manifest.forget("index.md")
+
+    self.assertEqual(expected, actual)
+    self.assertEqual(None, manifest.forget("index.md"))
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from build_profiler import DISABLED_PROFILER, STAGES, BuildProfiler
+from markdown_parser import MarkdownParser
+
+
+class BuildProfilerTest(unittest.TestCase):
+  def test_stage_outside_page_records_nothing(self):
+    profiler = BuildProfiler()
+    with profiler.stage("read"):
+      pass
+
+    expected = {}
+    actual = profiler.pages
+
+    self.assertEqual(expected, actual)
+
+  def test_disabled_profiler_records_nothing(self):
+    DISABLED_PROFILER.begin_page("index.md")
+    with DISABLED_PROFILER.stage("read"):
+      pass
+    DISABLED_PROFILER.end_page()
+
+    expected = {}
+    actual = DISABLED_PROFILER.pages
+
+    self.assertEqual(expected, actual)
+
+  def test_nested_stages_are_exclusive(self):
+    profiler = BuildProfiler()
+    profiler.begin_page("index.md")
+    with profiler.stage("html_nodes"):
+      with profiler.stage("inline_parsing"):
+        sum(range(100000))
+    profiler.end_page()
+
+    page = profiler.pages["index.md"]
+    html_nodes_seconds = page["stages"]["html_nodes"][0]
+    inline_parsing_seconds = page["stages"]["inline_parsing"][0]
+
+    self.assertLess(html_nodes_seconds, inline_parsing_seconds)
+    self.assertLessEqual(html_nodes_seconds + inline_parsing_seconds, page["total"])
+
+  def test_instrument_times_parser_stages(self):
+    profiler = BuildProfiler()
+    with profiler.instrument():
+      profiler.begin_page("index.md")
+      MarkdownParser.markdown_to_html_node("# Title\n\n* First **Item**\n* Second Item")
+
+    expected = ["block_split", "inline_parsing"]
+    actual = sorted(profiler.pages["index.md"]["stages"].keys())
+
+    self.assertEqual(expected, actual)
+
+  def test_instrument_restores_parser(self):
+    original = MarkdownParser.lines_to_typed_blocks
+    with BuildProfiler().instrument():
+      self.assertNotEqual(original, MarkdownParser.lines_to_typed_blocks)
+
+    self.assertEqual(original, MarkdownParser.lines_to_typed_blocks)
+
+  def test_report_lists_slowest_pages(self):
+    profiler = BuildProfiler()
+    for page in ["fast.md", "slow.md"]:
+      profiler.begin_page(page)
+      with profiler.stage("read"):
+        sum(range(100000 if page == "slow.md" else 10))
+    profiler.end_page()
+
+    lines = profiler.report(top = 1).splitlines()
+
+    self.assertEqual("slowest 1 of 2 pages, wall time in ms:", lines[0])
+    self.assertTrue(lines[2].startswith("slow.md"))
+    self.assertEqual(len(STAGES), len(lines) - 5)
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+from content_discovery import ContentPage, DirectoryCache, discover_pages
+
+
+class ContentDiscoveryTest(unittest.TestCase):
+  def _write(self, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as output_file:
+      output_file.write("# page")
+
+  def _age(self, directory: str) -> None:
+    # older than the racy window, so the listing of directory is cached
+    for root, dirs, files in os.walk(directory):
+      os.utime(root, ns=(0, 0))
+
+  def test_discover_pages(self):
+    with tempfile.TemporaryDirectory() as directory:
+      content = os.path.join(directory, "content")
+      self._write(os.path.join(content, "index.md"))
+      self._write(os.path.join(content, "blog", "post.md"))
+      self._write(os.path.join(content, "blog", "image.png"))
+
+      expected = [
+        ContentPage(os.path.join(content, "index.md"), "index.md", os.path.join("docs", "index.html")),
+        ContentPage(os.path.join(content, "blog", "post.md"), os.path.join("blog", "post.md"),
+                    os.path.join("docs", "blog", "post.html")),
+      ]
+      actual = discover_pages(content, "docs")
+
+      self.assertEqual(expected, actual)
+
+  def test_discover_pages_repeated_directory_name(self):
+    with tempfile.TemporaryDirectory() as directory:
+      content = os.path.join(directory, "content")
+      self._write(os.path.join(content, "content", "index.md"))
+
+      expected = [ os.path.join("docs", "content", "index.html") ]
+      actual = [page.output_path for page in discover_pages(content, "docs")]
+
+      self.assertEqual(expected, actual)
+
+  def test_discover_pages_missing_directory(self):
+    with tempfile.TemporaryDirectory() as directory:
+      expected = []
+      actual = discover_pages(os.path.join(directory, "content"), "docs")
+
+      self.assertEqual(expected, actual)
+
+  def test_discover_pages_reuses_unchanged_listing(self):
+    with tempfile.TemporaryDirectory() as directory:
+      content = os.path.join(directory, "content")
+      self._write(os.path.join(content, "index.md"))
+      self._age(content)
+      cache = DirectoryCache(os.path.join(directory, "cache.json"))
+      discover_pages(content, "docs", cache)
+
+      # a cached listing is trusted while the mtime of its directory is unchanged
+      self._write(os.path.join(content, "hidden.md"))
+      self._age(content)
+
+      expected = [ "index.md" ]
+      actual = [page.relative_path for page in discover_pages(content, "docs", DirectoryCache.load(cache.path))]
+
+      self.assertEqual(expected, actual)
+
+  def test_discover_pages_lists_changed_directory(self):
+    with tempfile.TemporaryDirectory() as directory:
+      content = os.path.join(directory, "content")
+      self._write(os.path.join(content, "index.md"))
+      self._age(content)
+      cache = DirectoryCache(os.path.join(directory, "cache.json"))
+      discover_pages(content, "docs", cache)
+
+      self._write(os.path.join(content, "about.md"))
+
+      expected = [ "about.md", "index.md" ]
+      actual = [page.relative_path for page in discover_pages(content, "docs", DirectoryCache.load(cache.path))]
+
+      self.assertEqual(expected, actual)
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,145 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dev_server import InotifyWatcher, PageCache, PollingWatcher
+
+
+class DevServerTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.content = os.path.join(self.directory.name, "content")
+    self.template = os.path.join(self.directory.name, "template.html")
+
+    self.write(os.path.join(self.content, "index.md"), "# Home")
+    self.write(self.template, "{{ Content }}")
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def write(self, path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as output_file:
+      output_file.write(content)
+
+  def test_polling_watcher_no_changes(self):
+    watcher = PollingWatcher([ self.content, self.template ])
+
+    expected = set()
+    actual = watcher.poll()
+
+    self.assertEqual(expected, actual)
+
+  def test_polling_watcher_changes(self):
+    watcher = PollingWatcher([ self.content, self.template ])
+    new_page = os.path.join(self.content, "blog", "tom.md")
+    self.write(new_page, "# Tom")
+    self.write(self.template, "<html>{{ Content }}</html>")
+    os.remove(os.path.join(self.content, "index.md"))
+
+    expected = { new_page, self.template, os.path.join(self.content, "index.md") }
+    actual = watcher.poll()
+
+    self.assertEqual(expected, actual)
+
+  def test_inotify_watcher_changes(self):
+    try:
+      watcher = InotifyWatcher([ self.content, self.template ])
+    except (OSError, AttributeError, TypeError):
+      self.skipTest("inotify is not available")
+
+    try:
+      self.write(os.path.join(self.content, "index.md"), "# Changed")
+      self.write(os.path.join(self.directory.name, "unwatched.txt"), "ignored")
+
+      expected = { os.path.join(self.content, "index.md") }
+      actual = watcher.wait_for_changes(timeout = 5)
+
+      self.assertEqual(expected, actual)
+    finally:
+      watcher.close()
+
+  def test_inotify_watcher_new_directory(self):
+    try:
+      watcher = InotifyWatcher([ self.content ])
+    except (OSError, AttributeError, TypeError):
+      self.skipTest("inotify is not available")
+
+    try:
+      new_directory = os.path.join(self.content, "blog")
+      os.makedirs(new_directory)
+      watcher.wait_for_changes(timeout = 5)
+      self.write(os.path.join(new_directory, "tom.md"), "# Tom")
+
+      expected = { os.path.join(new_directory, "tom.md") }
+      actual = watcher.wait_for_changes(timeout = 5)
+
+      self.assertEqual(expected, actual)
+    finally:
+      watcher.close()
+
+  def test_inotify_watcher_timeout(self):
+    try:
+      watcher = InotifyWatcher([ self.content ])
+    except (OSError, AttributeError, TypeError):
+      self.skipTest("inotify is not available")
+
+    try:
+      expected = set()
+      actual = watcher.wait_for_changes(timeout = 0.01)
+
+      self.assertEqual(expected, actual)
+    finally:
+      watcher.close()
+
+  def test_page_cache(self):
+    cache = PageCache()
+    page = os.path.join(self.content, "index.md")
+    cache.get(page)
+    self.write(page, "# Changed")
+
+    self.assertEqual(b"# Home", cache.get(page))
+    cache.clear()
+    self.assertEqual(b"# Changed", cache.get(page))
+    self.assertEqual(None, cache.get(os.path.join(self.content, "missing.md")))
+
+  def test_page_cache_drops_reads_overtaken_by_clear(self):
+    cache = PageCache()
+    page = os.path.join(self.content, "index.md")
+
+    def read_during_rebuild(*arguments):
+      # the rebuild rewrites the page and clears the cache after the old bytes were read
+      with open(*arguments) as input_file:
+        content = input_file.read()
+      self.write(page, "# Rebuilt")
+      cache.clear()
+      return io.BytesIO(content)
+
+    with mock.patch("dev_server.open", side_effect=read_during_rebuild, create=True):
+      self.assertEqual(b"# Home", cache.get(page))
+
+    self.assertEqual(b"# Rebuilt", cache.get(page))
+
+  def test_page_cache_skips_large_files(self):
+    cache = PageCache(max_file_size=4)
+    page = os.path.join(self.content, "index.md")
+
+    self.assertEqual(None, cache.get(page))
+
+  def test_page_cache_total_size(self):
+    cache = PageCache(max_size=8)
+    page = os.path.join(self.content, "index.md")
+    other_page = os.path.join(self.content, "about.md")
+    self.write(other_page, "# About")
+    cache.get(page)
+    cache.get(other_page)
+    self.write(other_page, "# Changed")
+
+    # the second page did not fit, it is read from disk again
+    self.assertEqual(b"# Changed", cache.get(other_page))
+    self.assertEqual(6, cache.size)
+
+if __name__ == "__main__":
+  unittest.main()
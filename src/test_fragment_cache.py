@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from fragment_cache import FragmentCache
+
+
+class FragmentCacheTest(unittest.TestCase):
+  def test_key_depends_on_markdown_basepath_and_version(self):
+    cache = FragmentCache("unused", "1")
+    key = cache.key("# Title", "/")
+
+    self.assertEqual(key, cache.key("# Title", "/"))
+    self.assertNotEqual(key, cache.key("# Other", "/"))
+    self.assertNotEqual(key, cache.key("# Title", "/blog/"))
+    self.assertNotEqual(key, FragmentCache("unused", "2").key("# Title", "/"))
+
+  def test_put_get(self):
+    with tempfile.TemporaryDirectory() as directory:
+      cache = FragmentCache(directory, "1")
+      key = cache.key("# Title", "/")
+      cache.put(key, "Title", "<div><h1>Title</h1></div>")
+
+      expected = ("Title", "<div><h1>Title</h1></div>")
+      actual = FragmentCache(directory, "1").get(key)
+
+      self.assertEqual(expected, actual)
+
+  def test_get_missing(self):
+    with tempfile.TemporaryDirectory() as directory:
+      cache = FragmentCache(directory, "1")
+
+      expected = None
+      actual = cache.get(cache.key("# Title", "/"))
+
+      self.assertEqual(expected, actual)
+
+  def test_prune_removes_unused_fragments(self):
+    with tempfile.TemporaryDirectory() as directory:
+      cache = FragmentCache(directory, "1")
+      kept = cache.key("# Kept", "/")
+      removed = cache.key("# Removed", "/")
+      cache.put(kept, "Kept", "<div></div>")
+      cache.put(removed, "Removed", "<div></div>")
+
+      next_cache = FragmentCache(directory, "1")
+      next_cache.touch(kept)
+      next_cache.prune()
+
+      self.assertEqual(("Kept", "<div></div>"), next_cache.get(kept))
+      self.assertEqual(None, next_cache.get(removed))
+      self.assertFalse(os.path.isdir(os.path.join(directory, removed[:2])) and removed[:2] != kept[:2])
+
+  def test_clear(self):
+    with tempfile.TemporaryDirectory() as directory:
+      cache = FragmentCache(os.path.join(directory, "cache"), "1")
+      key = cache.key("# Title", "/")
+      cache.put(key, "Title", "<div></div>")
+      cache.clear()
+
+      expected = None
+      actual = cache.get(key)
+
+      self.assertEqual(expected, actual)
+
+if __name__ == "__main__":
+  unittest.main()
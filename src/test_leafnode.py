@@ -38,5 +38,33 @@ class LeafNodeTest(unittest.TestCase):
 
     self.assertEqual(expected, actual)
 
+  def test_no_instance_dict(self):
+    this_node = LeafNode("GMail", "a")
+
+    self.assertFalse(hasattr(this_node, "__dict__"))
+
+  def test_props_to_html(self):
+    this_node = LeafNode("GMail", "a", { "href": "https://www.gmail.com", "target": "_self" })
+
+    expected = 'href="https://www.gmail.com" target="_self"'
+    actual = this_node.props_to_html()
+
+    self.assertEqual(expected, actual)
+
+  def test_to_html_reassigned_props(self):
+    this_node = LeafNode("GMail", "a", { "href": "https://www.gmail.com" })
+    this_node.to_html()
+    this_node.props = { "href": "https://mail.google.com" }
+
+    expected = '<a href="https://mail.google.com">GMail</a>'
+    actual = this_node.to_html()
+
+    self.assertEqual(expected, actual)
+
+  def test_tag_interned(self):
+    tag = "".join(["s", "pan"])
+
+    self.assertIs(LeafNode("a", "span").tag, LeafNode("b", tag).tag)
+
 if __name__ == "__main__":
   unittest.main()
\ No newline at end of file
@@ -0,0 +1,284 @@
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest
+from main import generate_page, rebuild_changed, remove_stale_outputs
+from static_sync import LinkStrategy
+
+STREAM_THRESHOLD = 256
+
+
+class GeneratePageTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.content = os.path.join(self.directory.name, "content")
+    self.template = os.path.join(self.directory.name, "template.html")
+
+    self.write(os.path.join(self.content, "index.md"), "# Home\n\nA [link](/blog/post) and ![logo](/logo.png)")
+    self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n> quote\n\n- one\n- two")
+    self.write(os.path.join(self.content, "blog", "draft.md"), "# Draft\n\n```\ncode\n```")
+    # above STREAM_THRESHOLD, so it is rendered straight from its file
+    self.write(os.path.join(self.content, "report.md"), "# Report\n\n" + "A **long** line.\n\n" * 40)
+    self.write(self.template, "<title>{{ Title }}</title><article>{{ Content }}</article>")
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def write(self, path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as output_file:
+      output_file.write(content)
+
+  def dest(self, name):
+    return os.path.join(self.directory.name, name)
+
+  def manifest(self, name):
+    return BuildManifest(os.path.join(self.directory.name, f"{name}.json"))
+
+  def build(self, dest_path, manifest = None, basepath = "/site/", **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+      generate_page(self.content, self.template, dest_path, basepath, manifest,
+                    stream_threshold=STREAM_THRESHOLD, **options)
+
+  def outputs(self, dest_path):
+    '''Relative output path -> bytes of every file below dest_path.'''
+    outputs = {}
+    for root, dirs, files in os.walk(dest_path):
+      for file in files:
+        path = os.path.join(root, file)
+        with open(path, "rb") as output_file:
+          outputs[os.path.relpath(path, dest_path)] = output_file.read()
+
+    return outputs
+
+  def entries(self, manifest, dest_path):
+    '''The manifest entries with their outputs relative to dest_path, comparable across builds.'''
+    return {page: (entry["inputs"], os.path.relpath(entry["output"], dest_path))
+            for page, entry in manifest.entries.items()}
+
+  def age_outputs(self, dest_path):
+    for root, dirs, files in os.walk(dest_path):
+      for file in files:
+        os.utime(os.path.join(root, file), ns=(0, 0))
+
+  def changed_outputs(self, dest_path):
+    '''Outputs written since age_outputs.'''
+    return sorted(relative_path for relative_path in self.outputs(dest_path)
+                  if os.stat(os.path.join(dest_path, relative_path)).st_mtime_ns != 0)
+
+  def test_pipelined_build_matches_serial_build(self):
+    serial_manifest = self.manifest("serial")
+    pipelined_manifest = self.manifest("pipelined")
+    self.build(self.dest("serial"), serial_manifest)
+    self.build(self.dest("pipelined"), pipelined_manifest, io_concurrency=2)
+
+    self.assertEqual(self.outputs(self.dest("serial")), self.outputs(self.dest("pipelined")))
+    self.assertEqual(self.entries(serial_manifest, self.dest("serial")),
+                     self.entries(pipelined_manifest, self.dest("pipelined")))
+    self.assertEqual(4, len(pipelined_manifest.entries))
+
+  def test_pipelined_build_skips_up_to_date_pages(self):
+    manifest = self.manifest("pipelined")
+    self.build(self.dest("pipelined"), manifest, io_concurrency=2)
+    self.age_outputs(self.dest("pipelined"))
+    self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nEdited")
+
+    self.build(self.dest("pipelined"), manifest, io_concurrency=2)
+
+    expected = [ os.path.join("blog", "post.html") ]
+    actual = self.changed_outputs(self.dest("pipelined"))
+
+    self.assertEqual(expected, actual)
+    self.assertEqual(4, len(manifest.entries))
+
+  def test_pipelined_build_skip_unchanged(self):
+    self.build(self.dest("pipelined"), io_concurrency=2)
+    self.age_outputs(self.dest("pipelined"))
+    self.write(os.path.join(self.content, "report.md"), "# Report\n\n" + "An edited line.\n\n" * 40)
+
+    self.build(self.dest("pipelined"), io_concurrency=2, skip_unchanged=True)
+
+    expected = [ "report.html" ]
+    actual = self.changed_outputs(self.dest("pipelined"))
+
+    self.assertEqual(expected, actual)
+
+  def test_parallel_build_matches_serial_build(self):
+    serial_manifest = self.manifest("serial")
+    parallel_manifest = self.manifest("parallel")
+    self.build(self.dest("serial"), serial_manifest)
+    self.build(self.dest("parallel"), parallel_manifest, jobs=2)
+
+    self.assertEqual(self.outputs(self.dest("serial")), self.outputs(self.dest("parallel")))
+    self.assertEqual(self.entries(serial_manifest, self.dest("serial")),
+                     self.entries(parallel_manifest, self.dest("parallel")))
+    self.assertEqual(4, len(parallel_manifest.entries))
+
+  def test_parallel_build_skips_up_to_date_pages(self):
+    manifest = self.manifest("parallel")
+    self.build(self.dest("parallel"), manifest, jobs=2)
+    self.age_outputs(self.dest("parallel"))
+    self.write(os.path.join(self.content, "report.md"), "# Report\n\n" + "An edited line.\n\n" * 40)
+
+    self.build(self.dest("parallel"), manifest, jobs=2)
+
+    expected = [ "report.html" ]
+    actual = self.changed_outputs(self.dest("parallel"))
+
+    self.assertEqual(expected, actual)
+    self.assertEqual(4, len(manifest.entries))
+
+  def test_incremental_build_skips_up_to_date_pages(self):
+    manifest = self.manifest("incremental")
+    self.build(self.dest("docs"), manifest)
+    self.age_outputs(self.dest("docs"))
+
+    self.build(self.dest("docs"), BuildManifest.load(manifest.path))
+
+    expected = []
+    actual = self.changed_outputs(self.dest("docs"))
+
+    self.assertEqual(expected, actual)
+
+  def test_incremental_build_markdown_change(self):
+    manifest = self.manifest("incremental")
+    self.build(self.dest("docs"), manifest)
+    self.age_outputs(self.dest("docs"))
+    self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited")
+
+    self.build(self.dest("docs"), BuildManifest.load(manifest.path))
+
+    expected = [ "index.html" ]
+    actual = self.changed_outputs(self.dest("docs"))
+
+    self.assertEqual(expected, actual)
+
+  def test_incremental_build_template_change(self):
+    manifest = self.manifest("incremental")
+    self.build(self.dest("docs"), manifest)
+    self.age_outputs(self.dest("docs"))
+    self.write(self.template, "<html>{{ Title }}{{ Content }}</html>")
+
+    self.build(self.dest("docs"), BuildManifest.load(manifest.path))
+
+    expected = sorted(self.outputs(self.dest("docs")))
+    actual = self.changed_outputs(self.dest("docs"))
+
+    self.assertEqual(expected, actual)
+
+  def test_incremental_build_basepath_change(self):
+    manifest = self.manifest("incremental")
+    self.build(self.dest("docs"), manifest)
+    self.age_outputs(self.dest("docs"))
+
+    self.build(self.dest("docs"), BuildManifest.load(manifest.path), basepath="/other/")
+
+    expected = sorted(self.outputs(self.dest("docs")))
+    actual = self.changed_outputs(self.dest("docs"))
+
+    self.assertEqual(expected, actual)
+    self.assertIn(b'href="/other/blog/post"', self.outputs(self.dest("docs"))["index.html"])
+
+  def test_incremental_build_removes_deleted_pages(self):
+    manifest = self.manifest("incremental")
+    self.build(self.dest("docs"), manifest)
+    os.remove(os.path.join(self.content, "blog", "draft.md"))
+
+    self.build(self.dest("docs"), BuildManifest.load(manifest.path))
+
+    expected = [ os.path.join("blog", "post.html"), "index.html", "report.html" ]
+    actual = sorted(self.outputs(self.dest("docs")))
+
+    self.assertEqual(expected, actual)
+    self.assertNotIn(os.path.join(self.content, "blog", "draft.md"), BuildManifest.load(manifest.path).entries)
+
+  def test_remove_stale_outputs(self):
+    previous_manifest = self.manifest("previous")
+    self.build(self.dest("docs"), previous_manifest)
+    self.write(os.path.join(self.dest("docs"), "index.css"), "body {}")
+    os.remove(os.path.join(self.content, "blog", "draft.md"))
+    os.remove(os.path.join(self.content, "blog", "post.md"))
+
+    # a full build records a fresh manifest, the previous one still lists the deleted pages
+    manifest = self.manifest("current")
+    self.build(self.dest("docs"), manifest)
+    with contextlib.redirect_stdout(io.StringIO()):
+      remove_stale_outputs(previous_manifest, manifest, self.dest("docs"))
+
+    expected = [ "index.css", "index.html", "report.html" ]
+    actual = sorted(self.outputs(self.dest("docs")))
+
+    self.assertEqual(expected, actual)
+
+  def rebuild(self, changed_paths, manifest):
+    arguments = argparse.Namespace(checksum=False, link_strategy=LinkStrategy.COPY, jobs=1,
+                                   stream_threshold=STREAM_THRESHOLD, io_concurrency=0,
+                                   skip_unchanged=False, precompress=False)
+    static = os.path.join(self.directory.name, "static")
+    with contextlib.redirect_stdout(io.StringIO()):
+      rebuild_changed(set(changed_paths), arguments, self.content, static, self.template, self.dest("docs"),
+                      "/site/", manifest, self.manifest("static"), self.manifest("compress"))
+
+  def test_rebuild_changed_page(self):
+    manifest = self.manifest("incremental")
+    self.build(self.dest("docs"), manifest)
+    self.age_outputs(self.dest("docs"))
+    page = os.path.join(self.content, "blog", "post.md")
+    self.write(page, "# Post\n\nEdited")
+
+    self.rebuild([ page ], manifest)
+
+    expected = [ os.path.join("blog", "post.html") ]
+    actual = self.changed_outputs(self.dest("docs"))
+
+    self.assertEqual(expected, actual)
+    self.assertIn(b"Edited", self.outputs(self.dest("docs"))[os.path.join("blog", "post.html")])
+
+  def test_rebuild_deleted_page(self):
+    manifest = self.manifest("incremental")
+    self.build(self.dest("docs"), manifest)
+    self.age_outputs(self.dest("docs"))
+    page = os.path.join(self.content, "index.md")
+    os.remove(page)
+
+    self.rebuild([ page ], manifest)
+
+    expected = [ os.path.join("blog", "draft.html"), os.path.join("blog", "post.html"), "report.html" ]
+    actual = sorted(self.outputs(self.dest("docs")))
+
+    self.assertEqual(expected, actual)
+    self.assertEqual([], self.changed_outputs(self.dest("docs")))
+
+  def test_rebuild_template_change(self):
+    manifest = self.manifest("incremental")
+    self.build(self.dest("docs"), manifest)
+    self.age_outputs(self.dest("docs"))
+    self.write(self.template, "<html>{{ Title }}{{ Content }}</html>")
+
+    self.rebuild([ self.template ], manifest)
+
+    expected = sorted(self.outputs(self.dest("docs")))
+    actual = self.changed_outputs(self.dest("docs"))
+
+    self.assertEqual(expected, actual)
+
+  def test_rebuild_static_change(self):
+    manifest = self.manifest("incremental")
+    self.build(self.dest("docs"), manifest)
+    self.age_outputs(self.dest("docs"))
+    stylesheet = os.path.join(self.directory.name, "static", "index.css")
+    self.write(stylesheet, "body {}")
+
+    self.rebuild([ stylesheet ], manifest)
+
+    expected = [ "index.css" ]
+    actual = self.changed_outputs(self.dest("docs"))
+
+    self.assertEqual(expected, actual)
+
+if __name__ == "__main__":
+  unittest.main()
@@ -1,7 +1,10 @@
+import io
+import mmap
+import tempfile
 import unittest
 
 from leafnode import LeafNode
-from markdown_parser import BlockType, MarkdownParser
+from markdown_parser import Block, BlockType, MarkdownParser
 from parentnode import ParentNode
 
 
@@ -23,6 +26,77 @@ This is a paragraph of text. It has some **bold** and *italic* words inside of i
 
     self.assertEqual(expected, actual)
 
+  def test_markdown_to_blocks_ordered_list_numbering_break(self):
+    markdown = """1. First Item
+2. Second Item
+4. Not the third item"""
+
+    expected = ["1. First Item\n2. Second Item", "4. Not the third item"]
+    actual = MarkdownParser.markdown_to_blocks(markdown)
+
+    self.assertEqual(expected, actual)
+
+  def test_markdown_to_blocks_code_keeps_empty_lines(self):
+    markdown = """```
+first line
+
+second line```
+After the code"""
+
+    expected = ["```\nfirst line\n\nsecond line```", "After the code"]
+    actual = MarkdownParser.markdown_to_blocks(markdown)
+
+    self.assertEqual(expected, actual)
+
+  def test_markdown_to_blocks_long_list(self):
+    markdown = "\n".join(f"{i + 1}. Item" for i in range(20000))
+
+    expected = [markdown]
+    actual = MarkdownParser.markdown_to_blocks(markdown)
+
+    self.assertEqual(expected, actual)
+
+  def test_markdown_to_typed_blocks(self):
+    markdown = """## A heading
+
+* First item
+- Second item
+
+1. First
+2. Second
+
+> Quote
+>> Nested
+
+```
+code
+```
+![image](/image.png)
+Text"""
+
+    expected = [Block(BlockType.HEADING, ["## A heading"], 2),
+                Block(BlockType.UNORDERED_LIST, ["* First item", "- Second item"]),
+                Block(BlockType.ORDERED_LIST, ["1. First", "2. Second"]),
+                Block(BlockType.QUOTE, ["> Quote", ">> Nested"]),
+                Block(BlockType.PARAGRAPH, [""]),
+                Block(BlockType.CODE, ["```", "code", "```"]),
+                Block(BlockType.IMAGE, ["![image](/image.png)"]),
+                Block(BlockType.PARAGRAPH, ["Text"])]
+    actual = MarkdownParser.markdown_to_typed_blocks(markdown)
+
+    self.assertEqual(expected, actual)
+
+  def test_markdown_to_typed_blocks_matches_block_to_block_type(self):
+    markdown = """*no space
+####### Seven
+```
+unclosed code"""
+
+    expected = [MarkdownParser.block_to_block_type(block) for block in MarkdownParser.markdown_to_blocks(markdown)]
+    actual = [block.kind for block in MarkdownParser.markdown_to_typed_blocks(markdown)]
+
+    self.assertEqual(expected, actual)
+
   def test_block_to_block_type_code(self):
     markdown = '```print("Hello World!")```'
 
@@ -544,6 +618,129 @@ def find_all(self: str, pattern: str) -> Iterator[Tuple[int, str]]:
     actual = MarkdownParser.markdown_to_html_node(markdown)
     self.assertEqual(expected, actual)
 
+  def test_iter_typed_blocks_is_lazy(self):
+    consumed = []
+    def lines():
+      for line in ["# Title", "", "Paragraph", "", "* Item"]:
+        consumed.append(line)
+        yield line
+
+    blocks = MarkdownParser.iter_typed_blocks(lines())
+
+    expected = Block(BlockType.HEADING, ["# Title"], 1)
+    actual = next(blocks)
+
+    self.assertEqual(expected, actual)
+    self.assertEqual(["# Title", "", "Paragraph"], consumed)
+
+  def test_iter_html_nodes(self):
+    markdown = """# Title
+
+Some **bold** text
+
+> Quote
+
+1. First
+2. Second"""
+    buffer = self._mapped((markdown + "\n").encode("utf-8"))
+
+    expected = MarkdownParser.markdown_to_html_node(markdown).children
+    actual = list(MarkdownParser.iter_html_nodes(MarkdownParser.read_mapped_lines(buffer)))
+
+    self.assertEqual(expected, actual)
+
+  def test_extract_title_from_lines_stops_at_title(self):
+    lines = iter(["Intro", "# The title", "## Not read"])
+
+    expected = "The title"
+    actual = MarkdownParser.extract_title_from_lines(lines)
+
+    self.assertEqual(expected, actual)
+    self.assertEqual(["## Not read"], list(lines))
+
+  def _mapped(self, content: bytes) -> mmap.mmap:
+    markdown_file = tempfile.TemporaryFile()
+    self.addCleanup(markdown_file.close)
+    markdown_file.write(content)
+    markdown_file.flush()
+
+    buffer = mmap.mmap(markdown_file.fileno(), 0, access=mmap.ACCESS_READ)
+    self.addCleanup(buffer.close)
+    return buffer
+
+  def test_read_mapped_lines(self):
+    buffer = self._mapped("# Title\r\n\nCafé **bold**\n".encode("utf-8"))
+
+    expected = ["# Title", "", "Café **bold**"]
+    actual = list(MarkdownParser.read_mapped_lines(buffer))
+
+    self.assertEqual(expected, actual)
+
+  def test_read_mapped_lines_releases_each_range_once(self):
+    class RecordingBuffer(io.BytesIO):
+      def madvise(self, option, start, length):
+        advised.append((start, length))
+
+    advised = []
+    line = b"x" * 1023 + b"\n"
+    buffer = RecordingBuffer(line * 4096)
+    list(MarkdownParser.read_mapped_lines(buffer))
+
+    # 4 MiB of lines, released one MiB after another, each range exactly once
+    expected = [(index * 1024 * 1024, 1024 * 1024) for index in range(4)]
+    actual = advised
+
+    self.assertEqual(expected, actual)
+
+  def test_extract_title_from_buffer(self):
+    buffer = self._mapped("Intro\n## Not the title\n#  Café title \r\n# Second\n".encode("utf-8"))
+
+    expected = "Café title"
+    actual = MarkdownParser.extract_title_from_buffer(buffer)
+
+    self.assertEqual(expected, actual)
+
+  def test_extract_title_from_buffer_empty_title_line(self):
+    buffer = self._mapped(b"#\nNot the title\n")
+
+    expected = MarkdownParser.extract_title("#\nNot the title\n")
+    actual = MarkdownParser.extract_title_from_buffer(buffer)
+
+    self.assertEqual(expected, actual)
+
+  def test_extract_title_from_buffer_missing(self):
+    with self.assertRaises(Exception):
+      MarkdownParser.extract_title_from_buffer(self._mapped(b"## Only a subtitle\n"))
+
+  def test_parse_document(self):
+    markdown = """Intro
+
+# The title
+
+## Not the title"""
+    document = MarkdownParser.parse_document(markdown)
+
+    self.assertEqual("The title", document.title)
+    self.assertEqual(MarkdownParser.markdown_to_html_node(markdown), document.content)
+    self.assertEqual({ "lines": 5, "blocks": 3 }, document.metadata)
+
+  def test_parse_document_matches_extract_title(self):
+    markdown = """```
+#   Title in code  
+```
+# Second"""
+
+    expected = MarkdownParser.extract_title(markdown)
+    actual = MarkdownParser.parse_document(markdown).title
+
+    self.assertEqual(expected, actual)
+
+  def test_parse_document_without_title(self):
+    expected = None
+    actual = MarkdownParser.parse_document("## Only a subtitle").title
+
+    self.assertEqual(expected, actual)
+
   def test_extract_title_header_found(self):
     markdown = '''
 # This is the title
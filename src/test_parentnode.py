@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from leafnode import LeafNode
@@ -57,5 +58,42 @@ class ParentNodeTest(unittest.TestCase):
 
     self.assertEqual(expected, actual)
 
+  def test_write_html(self):
+    this_node = ParentNode("p",
+                           children = [
+                             LeafNode("Hello "),
+                             LeafNode("World", "b")],
+                           props = { "class": "greeting" })
+    sink = io.StringIO()
+    this_node.write_html(sink)
+
+    expected = '<p class="greeting">Hello <b>World</b></p>'
+    actual = sink.getvalue()
+
+    self.assertEqual(expected, actual)
+
+  def test_write_html_no_children(self):
+    this_node = ParentNode("p",
+                           children = None,
+                           props=None)
+
+    with self.assertRaises(ValueError):
+      this_node.write_html(io.StringIO())
+
+  def test_to_html_deeply_nested(self):
+    this_node = LeafNode("Deep")
+    for _ in range(500):
+      this_node = ParentNode("blockquote", [ this_node ])
+
+    expected = "<blockquote>" * 500 + "Deep" + "</blockquote>" * 500
+    actual = this_node.to_html()
+
+    self.assertEqual(expected, actual)
+
+  def test_no_instance_dict(self):
+    this_node = ParentNode("p", [ LeafNode("Gmail") ])
+
+    self.assertFalse(hasattr(this_node, "__dict__"))
+
 if __name__ == "__main__":
   unittest.main()
\ No newline at end of file
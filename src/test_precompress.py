@@ -0,0 +1,105 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from build_manifest import BuildManifest
+from precompress import MIN_SIZE, compressible_files, precompress, remove_stale_compressed
+
+
+class PrecompressTest(unittest.TestCase):
+  def _write(self, path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as output_file:
+      output_file.write(content)
+
+  def test_compressible_files(self):
+    with tempfile.TemporaryDirectory() as directory:
+      page = os.path.join(directory, "blog", "index.html")
+      self._write(page, b"<p>page</p>" * MIN_SIZE)
+      self._write(os.path.join(directory, "tiny.css"), b"p {}")
+      self._write(os.path.join(directory, "image.png"), b"\x89PNG" * MIN_SIZE)
+
+      expected = [ page ]
+      actual = compressible_files(directory)
+
+      self.assertEqual(expected, actual)
+
+  def test_precompress_writes_gzip_sibling(self):
+    with tempfile.TemporaryDirectory() as directory:
+      page = os.path.join(directory, "index.html")
+      content = b"<p>page</p>" * MIN_SIZE
+      self._write(page, content)
+      precompress(directory, BuildManifest(os.path.join(directory, "manifest.json")))
+
+      with open(f"{page}.gz", "rb") as compressed_file:
+        expected = content
+        actual = gzip.decompress(compressed_file.read())
+
+      self.assertEqual(expected, actual)
+
+  def test_precompress_skips_unchanged_sources(self):
+    with tempfile.TemporaryDirectory() as directory:
+      page = os.path.join(directory, "site", "index.html")
+      self._write(page, b"<p>page</p>" * MIN_SIZE)
+      manifest = BuildManifest(os.path.join(directory, "manifest.json"))
+      precompress(os.path.join(directory, "site"), manifest)
+      os.utime(f"{page}.gz", ns=(0, 0))
+
+      precompress(os.path.join(directory, "site"), manifest)
+
+      expected = 0
+      actual = os.stat(f"{page}.gz").st_mtime_ns
+
+      self.assertEqual(expected, actual)
+
+  def test_precompress_removes_orphaned_siblings(self):
+    with tempfile.TemporaryDirectory() as directory:
+      site = os.path.join(directory, "site")
+      page = os.path.join(site, "blog", "index.html")
+      self._write(page, b"<p>page</p>" * MIN_SIZE)
+      manifest = BuildManifest(os.path.join(directory, "manifest.json"))
+      precompress(site, manifest)
+
+      os.remove(page)
+      precompress(site, manifest)
+
+      expected = []
+      actual = os.listdir(site)
+
+      self.assertEqual(expected, actual)
+
+  def test_remove_stale_compressed_edited_source(self):
+    with tempfile.TemporaryDirectory() as directory:
+      site = os.path.join(directory, "site")
+      page = os.path.join(site, "index.html")
+      other_page = os.path.join(site, "about.html")
+      self._write(page, b"<p>page</p>" * MIN_SIZE)
+      self._write(other_page, b"<p>about</p>" * MIN_SIZE)
+      manifest = BuildManifest(os.path.join(directory, "manifest.json"))
+      precompress(site, manifest)
+
+      self._write(page, b"<p>edited</p>" * MIN_SIZE)
+      remove_stale_compressed(site, BuildManifest.load(manifest.path))
+
+      self.assertFalse(os.path.exists(f"{page}.gz"))
+      self.assertTrue(os.path.exists(f"{other_page}.gz"))
+      self.assertNotIn(f"{page}.gz", BuildManifest.load(manifest.path).entries)
+
+  def test_remove_stale_compressed_deleted_source(self):
+    with tempfile.TemporaryDirectory() as directory:
+      site = os.path.join(directory, "site")
+      page = os.path.join(site, "contact", "index.html")
+      self._write(page, b"<p>page</p>" * MIN_SIZE)
+      self._write(os.path.join(site, "index.html"), b"<p>home</p>" * MIN_SIZE)
+      manifest = BuildManifest(os.path.join(directory, "manifest.json"))
+      precompress(site, manifest)
+
+      os.remove(page)
+      remove_stale_compressed(site, BuildManifest.load(manifest.path))
+
+      self.assertFalse(os.path.exists(os.path.dirname(page)))
+      self.assertTrue(os.path.exists(os.path.join(site, "index.html.gz")))
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,105 @@
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from content_discovery import ContentPage
+from shards import merge_shards, pages_in_shard, parse_shard, shard_directory, shard_of
+
+
+class ShardsTest(unittest.TestCase):
+  def test_parse_shard(self):
+    expected = (2, 8)
+    actual = parse_shard("2/8")
+
+    self.assertEqual(expected, actual)
+
+  def test_parse_shard_invalid(self):
+    for text in ["2", "0/8", "9/8", "a/b", "1/0"]:
+      with self.assertRaises(argparse.ArgumentTypeError):
+        parse_shard(text)
+
+  def test_shard_of_in_range(self):
+    shards = {shard_of(f"page{index}/index.md", 8) for index in range(200)}
+
+    expected = set(range(1, 9))
+    actual = shards
+
+    self.assertEqual(expected, actual)
+
+  def test_pages_in_shard_partition(self):
+    pages = [ContentPage(f"./content/page{index}/index.md", f"page{index}/index.md", f"./docs/page{index}/index.html")
+             for index in range(200)]
+    shards = [pages_in_shard(pages, (index, 4)) for index in range(1, 5)]
+
+    expected = sorted(page.source for page in pages)
+    actual = sorted(page.source for shard in shards for page in shard)
+
+    self.assertEqual(expected, actual)
+    self.assertTrue(all(shard for shard in shards))
+
+  def _write_shards(self, shards_path: str, content: str = "") -> None:
+    for index, page in [(1, "index.html"), (2, os.path.join("blog", "index.html"))]:
+      page_path = os.path.join(shard_directory(shards_path, index, 2), page)
+      os.makedirs(os.path.dirname(page_path), exist_ok=True)
+      with open(page_path, "w") as page_file:
+        page_file.write(f"{page}{content}")
+
+  def _merge(self, directory: str, incremental: bool = False, skip_unchanged: bool = False) -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+      merge_shards(os.path.join(directory, "shards"), 2, os.path.join(directory, "docs"),
+                   os.path.join(directory, "merge_manifest"), incremental, skip_unchanged=skip_unchanged)
+
+  def test_merge_shards(self):
+    with tempfile.TemporaryDirectory() as directory:
+      dest_path = os.path.join(directory, "docs")
+      self._write_shards(os.path.join(directory, "shards"))
+
+      self._merge(directory)
+
+      expected = ["blog/index.html", "index.html"]
+      actual = sorted(os.path.relpath(os.path.join(root, file), dest_path).replace(os.sep, "/")
+                      for root, dirs, files in os.walk(dest_path) for file in files)
+
+      self.assertEqual(expected, actual)
+
+  def test_merge_shards_missing_shard(self):
+    with tempfile.TemporaryDirectory() as directory:
+      with self.assertRaises(Exception):
+        self._merge(directory)
+
+  def test_merge_shards_skip_unchanged_keeps_identical_pages(self):
+    with tempfile.TemporaryDirectory() as directory:
+      page_path = os.path.join(directory, "docs", "index.html")
+      self._write_shards(os.path.join(directory, "shards"))
+      self._merge(directory)
+      os.utime(page_path, ns=(0, 0))
+
+      # rebuilt shards hold the same bytes under a fresh modification time
+      self._write_shards(os.path.join(directory, "shards"))
+      self._merge(directory, incremental=True, skip_unchanged=True)
+
+      expected = 0
+      actual = os.stat(page_path).st_mtime_ns
+
+      self.assertEqual(expected, actual)
+
+  def test_merge_shards_skip_unchanged_copies_changed_pages(self):
+    with tempfile.TemporaryDirectory() as directory:
+      page_path = os.path.join(directory, "docs", "index.html")
+      self._write_shards(os.path.join(directory, "shards"))
+      self._merge(directory)
+
+      self._write_shards(os.path.join(directory, "shards"), " changed")
+      self._merge(directory, incremental=True, skip_unchanged=True)
+
+      with open(page_path, "r") as page_file:
+        expected = "index.html changed"
+        actual = page_file.read()
+
+      self.assertEqual(expected, actual)
+
+if __name__ == "__main__":
+  unittest.main()
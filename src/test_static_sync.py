@@ -0,0 +1,145 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from build_manifest import BuildManifest
+from static_sync import LinkStrategy, is_unchanged, publish_file, sync_static
+
+
+class StaticSyncTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.TemporaryDirectory()
+    self.source = os.path.join(self.directory.name, "static")
+    self.target = os.path.join(self.directory.name, "docs")
+    self.manifest = BuildManifest(os.path.join(self.directory.name, "manifest.json"))
+
+    self.write(os.path.join(self.source, "index.css"), "body {}")
+    self.write(os.path.join(self.source, "images", "logo.svg"), "<svg></svg>")
+
+  def tearDown(self):
+    self.directory.cleanup()
+
+  def write(self, path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as output_file:
+      output_file.write(content)
+
+  def read(self, path):
+    with open(path, "r") as input_file:
+      return input_file.read()
+
+  def sync(self, compare_content = False, strategy = LinkStrategy.COPY):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+      sync_static(self.source, self.target, self.manifest, compare_content, strategy)
+
+    return output.getvalue()
+
+  def test_sync_copies_all_files(self):
+    self.sync()
+
+    self.assertEqual("body {}", self.read(os.path.join(self.target, "index.css")))
+    self.assertEqual("<svg></svg>", self.read(os.path.join(self.target, "images", "logo.svg")))
+
+  def test_sync_skips_unchanged_files(self):
+    self.sync()
+
+    expected = ""
+    actual = self.sync()
+
+    self.assertEqual(expected, actual)
+
+  def test_sync_copies_changed_files(self):
+    self.sync()
+    self.write(os.path.join(self.source, "index.css"), "body { margin: 0 }")
+    self.sync()
+
+    self.assertEqual("body { margin: 0 }", self.read(os.path.join(self.target, "index.css")))
+
+  def test_sync_removes_orphaned_files(self):
+    self.sync()
+    os.remove(os.path.join(self.source, "images", "logo.svg"))
+    self.sync()
+
+    self.assertFalse(os.path.exists(os.path.join(self.target, "images")))
+
+  def test_sync_keeps_files_it_did_not_publish(self):
+    self.write(os.path.join(self.target, "index.html"), "<html></html>")
+    self.sync()
+    self.sync()
+
+    self.assertTrue(os.path.exists(os.path.join(self.target, "index.html")))
+
+  def test_sync_missing_source(self):
+    with self.assertRaises(Exception):
+      sync_static(os.path.join(self.directory.name, "missing"), self.target, self.manifest)
+
+  def test_is_unchanged_compare_content(self):
+    self.sync()
+    source_path = os.path.join(self.source, "index.css")
+    target_path = os.path.join(self.target, "index.css")
+    os.utime(target_path, ns=(0, 0))
+
+    self.assertFalse(is_unchanged(source_path, target_path))
+    self.assertTrue(is_unchanged(source_path, target_path, compare_content = True))
+    self.assertTrue(is_unchanged(source_path, target_path))
+
+  def test_is_unchanged_keep_unchanged(self):
+    self.sync()
+    source_path = os.path.join(self.source, "index.css")
+    target_path = os.path.join(self.target, "index.css")
+    os.utime(target_path, ns=(0, 0))
+
+    self.assertTrue(is_unchanged(source_path, target_path, keep_unchanged = True))
+    self.assertEqual(0, os.stat(target_path).st_mtime_ns)
+
+  def test_publish_file_all_strategies(self):
+    source_path = os.path.join(self.source, "index.css")
+
+    for strategy in LinkStrategy:
+      target_path = os.path.join(self.directory.name, f"{strategy}.css")
+      publish_file(source_path, target_path, strategy)
+
+      self.assertEqual("body {}", self.read(target_path))
+      self.assertTrue(is_unchanged(source_path, target_path))
+
+  def test_publish_file_short_kernel_copy_falls_back(self):
+    source_path = os.path.join(self.source, "index.css")
+
+    # the syscall copying nothing before the end of the file, as some filesystems do, the
+    # later calls are left alone because shutil.copy2 itself uses sendfile on linux
+    for strategy, syscall in [(LinkStrategy.COPY_FILE_RANGE, "copy_file_range"), (LinkStrategy.SENDFILE, "sendfile")]:
+      target_path = os.path.join(self.directory.name, f"{strategy}.css")
+      real_syscall = getattr(os, syscall)
+      calls = []
+      def short_copy(*arguments):
+        calls.append(arguments)
+        return 0 if len(calls) == 1 else real_syscall(*arguments)
+
+      with mock.patch(f"os.{syscall}", side_effect=short_copy):
+        publish_file(source_path, target_path, strategy)
+
+      self.assertEqual("body {}", self.read(target_path))
+
+  def test_publish_file_hardlink_replaces_existing_target(self):
+    source_path = os.path.join(self.source, "index.css")
+    target_path = os.path.join(self.directory.name, "index.css")
+    self.write(target_path, "old content")
+
+    publish_file(source_path, target_path, LinkStrategy.HARDLINK)
+
+    self.assertTrue(os.path.samefile(source_path, target_path))
+
+  def test_sync_hardlink_skips_unchanged_files(self):
+    self.sync(strategy = LinkStrategy.HARDLINK)
+
+    expected = ""
+    actual = self.sync(strategy = LinkStrategy.HARDLINK)
+
+    self.assertEqual(expected, actual)
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,105 @@
+import io
+import os
+import tempfile
+import unittest
+
+from leafnode import LeafNode
+from parentnode import ParentNode
+from template import Template
+
+
+class TemplateTest(unittest.TestCase):
+  def test_placeholders(self):
+    template = Template("<title>{{ Title }}</title><body>{{Content}}</body><footer>{{ Footer  }}</footer>")
+
+    expected = ["Title", "Content", "Footer"]
+    actual = template.placeholders()
+
+    self.assertEqual(expected, actual)
+
+  def test_render(self):
+    template = Template("<title>{{ Title }}</title><h1>{{ Title }}</h1><article>{{ Content }}</article>")
+
+    expected = "<title>Home</title><h1>Home</h1><article><p>Hello</p></article>"
+    actual = template.render({ "Title": "Home", "Content": "<p>Hello</p>" })
+
+    self.assertEqual(expected, actual)
+
+  def test_render_node_value(self):
+    template = Template("<article>{{ Content }}</article>")
+    content = ParentNode("p", [ LeafNode("Hello") ])
+
+    expected = "<article><p>Hello</p></article>"
+    actual = template.render({ "Content": content })
+
+    self.assertEqual(expected, actual)
+
+  def test_render_unknown_placeholder(self):
+    template = Template("<title>{{ Title }}</title>{{ Unknown }}")
+
+    expected = "<title>Home</title>{{ Unknown }}"
+    actual = template.render({ "Title": "Home" })
+
+    self.assertEqual(expected, actual)
+
+  def test_render_basepath(self):
+    template = Template('<link href="/index.css" /><img src="/logo.png" /><a href="https://boot.dev">{{ Title }}</a>',
+                        "/blog/")
+
+    expected = '<link href="/blog/index.css" /><img src="/blog/logo.png" /><a href="https://boot.dev">Home</a>'
+    actual = template.render({ "Title": "Home" })
+
+    self.assertEqual(expected, actual)
+
+  def test_render_basepath_not_applied_to_values(self):
+    template = Template("<article>{{ Content }}</article>", "/blog/")
+
+    expected = '<article><code>href="/index.css"</code></article>'
+    actual = template.render({ "Content": '<code>href="/index.css"</code>' })
+
+    self.assertEqual(expected, actual)
+
+  def test_write(self):
+    template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+    content = ParentNode("p", [ LeafNode("Hello") ])
+    sink = io.StringIO()
+    template.write(sink, { "Title": "Home", "Content": content })
+
+    expected = template.render({ "Title": "Home", "Content": content })
+    actual = sink.getvalue()
+
+    self.assertEqual(expected, actual)
+
+  def test_include_partials(self):
+    with tempfile.TemporaryDirectory() as directory:
+      os.makedirs(os.path.join(directory, "partials"))
+      with open(os.path.join(directory, "partials", "header.html"), "w") as partial_file:
+        partial_file.write('<header>{{> nav.html }}</header>')
+      with open(os.path.join(directory, "partials", "nav.html"), "w") as partial_file:
+        partial_file.write('<a href="/">{{ Title }}</a>')
+      template_path = os.path.join(directory, "template.html")
+      with open(template_path, "w") as template_file:
+        template_file.write("{{> partials/header.html }}<article>{{ Content }}</article>")
+
+      template = Template.load(template_path, "/blog/")
+
+      expected = '<header><a href="/blog/">Home</a></header><article><p>Hello</p></article>'
+      actual = template.render({ "Title": "Home", "Content": "<p>Hello</p>" })
+
+      self.assertEqual(expected, actual)
+      self.assertEqual([template_path, 
+                        os.path.join(directory, "partials", "header.html"), 
+                        os.path.join(directory, "partials", "nav.html")], 
+                       list(template.dependencies))
+
+  def test_include_cycle(self):
+    with tempfile.TemporaryDirectory() as directory:
+      partial_path = os.path.join(directory, "loop.html")
+      with open(partial_path, "w") as partial_file:
+        partial_file.write("{{> loop.html }}")
+
+      with self.assertRaises(ValueError):
+        Template.load(partial_path)
+
+if __name__ == "__main__":
+  unittest.main()
@@ -1,7 +1,6 @@
 import unittest
 
 from leafnode import LeafNode
-from parentnode import ParentNode
 from textnode import TextNode, TextType
 
 
@@ -57,6 +56,11 @@ class TextNodeTest(unittest.TestCase):
 
     self.assertEqual(expected, actual)
 
+  def test_no_instance_dict(self):
+    this_node = TextNode("This is a text node", TextType.TEXT)
+
+    self.assertFalse(hasattr(this_node, "__dict__"))
+
   def test_to_leafnode_TEXT(self):
     this_node = TextNode("This is a text node", TextType.TEXT)
 
@@ -68,7 +72,7 @@ class TextNodeTest(unittest.TestCase):
   def test_to_leafnode_BOLD(self):
     this_node = TextNode("This is a bold text node", TextType.BOLD)
 
-    expected = ParentNode("b", [ LeafNode("This is a bold text node") ])
+    expected = LeafNode("This is a bold text node", "b")
     actual = this_node.to_leafnode()
 
     self.assertEqual(expected, actual)
@@ -76,7 +80,7 @@ class TextNodeTest(unittest.TestCase):
   def test_to_leafnode_ITALIC(self):
     this_node = TextNode("This is a italic text node", TextType.ITALIC)
 
-    expected = ParentNode("i", [ LeafNode("This is a italic text node") ])
+    expected = LeafNode("This is a italic text node", "i")
     actual = this_node.to_leafnode()
 
     self.assertEqual(expected, actual)
@@ -84,7 +88,7 @@ class TextNodeTest(unittest.TestCase):
   def test_to_leafnode_CODE(self):
     this_node = TextNode("This is a code block", TextType.CODE)
 
-    expected = ParentNode("code", [ LeafNode("This is a code block") ])
+    expected = LeafNode("This is a code block", "code")
     actual = this_node.to_leafnode()
 
     self.assertEqual(expected, actual)
@@ -92,7 +96,7 @@ class TextNodeTest(unittest.TestCase):
   def test_to_leafnode_LINK(self):
     this_node = TextNode("This is a Hyperlink", TextType.LINK, "https://www.gmail.com")
 
-    expected = ParentNode("a", [ LeafNode("This is a Hyperlink") ], { "href": "https://www.gmail.com"})
+    expected = LeafNode("This is a Hyperlink", "a", { "href": "https://www.gmail.com"})
     actual = this_node.to_leafnode()
 
     self.assertEqual(expected, actual)
@@ -105,6 +109,30 @@ class TextNodeTest(unittest.TestCase):
 
     self.assertEqual(expected, actual)
 
+  def test_to_leafnode_LINK_basepath(self):
+    this_node = TextNode("This is a Hyperlink", TextType.LINK, "/blog/tom")
+
+    expected = LeafNode("This is a Hyperlink", "a", { "href": "/static-site-generator/blog/tom"})
+    actual = this_node.to_leafnode("/static-site-generator/")
+
+    self.assertEqual(expected, actual)
+
+  def test_to_leafnode_IMAGE_basepath(self):
+    this_node = TextNode("This is an image", TextType.IMAGE, "/images/tom.png")
+
+    expected = LeafNode("", "img", { "src": "/static-site-generator/images/tom.png", "alt": "This is an image"})
+    actual = this_node.to_leafnode("/static-site-generator/")
+
+    self.assertEqual(expected, actual)
+
+  def test_to_leafnode_LINK_basepath_absolute_url(self):
+    this_node = TextNode("This is a Hyperlink", TextType.LINK, "https://www.gmail.com")
+
+    expected = LeafNode("This is a Hyperlink", "a", { "href": "https://www.gmail.com"})
+    actual = this_node.to_leafnode("/static-site-generator/")
+
+    self.assertEqual(expected, actual)
+
   def test_split_nodes_delimiter_BOLD(self):
     this_node = TextNode("This is text with **BOLD** word", TextType.TEXT)
 
@@ -547,6 +575,70 @@ class TextNodeTest(unittest.TestCase):
 
     self.assertEqual(expected, actual)
 
+  def test_text_to_textnodes_adjacent_delimiters(self):
+    text = "**first****second** and `code``more code`"
+
+    expected = [
+      TextNode("first", TextType.BOLD),
+      TextNode("second", TextType.BOLD),
+      TextNode(" and ", TextType.TEXT),
+      TextNode("code", TextType.CODE),
+      TextNode("more code", TextType.CODE),
+    ]
+    actual = TextNode.text_to_textnodes(text)
+
+    self.assertEqual(expected, actual)
+
+  def test_text_to_textnodes_markup_inside_code_not_supported(self):
+    text = "Call `snake_case_function()` now"
+
+    expected = [
+      TextNode("Call ", TextType.TEXT),
+      TextNode("snake_case_function()", TextType.CODE),
+      TextNode(" now", TextType.TEXT),
+    ]
+    actual = TextNode.text_to_textnodes(text)
+
+    self.assertEqual(expected, actual)
+
+  def test_text_to_textnodes_delimiters_do_not_span_links(self):
+    text = "This is **bold [link](https://boot.dev) text**"
+
+    with self.assertRaises(Exception):
+      TextNode.text_to_textnodes(text)
+
+  def test_text_to_textnodes_underscore_in_url(self):
+    text = "A [link_with_underscores](https://boot.dev/some_page) and _italic_"
+
+    expected = [
+      TextNode("A ", TextType.TEXT),
+      TextNode("link_with_underscores", TextType.LINK, "https://boot.dev/some_page"),
+      TextNode(" and ", TextType.TEXT),
+      TextNode("italic", TextType.ITALIC),
+    ]
+    actual = TextNode.text_to_textnodes(text)
+
+    self.assertEqual(expected, actual)
+
+  def test_text_to_textnodes_bracket_before_image(self):
+    expected = [
+      TextNode("See [note] and ", TextType.TEXT),
+      TextNode("pic", TextType.IMAGE, "/p.png"),
+    ]
+    actual = TextNode.text_to_textnodes("See [note] and ![pic](/p.png)")
+
+    self.assertEqual(expected, actual)
+
+  def test_text_to_textnodes_image_inside_link(self):
+    expected = [
+      TextNode("[", TextType.TEXT),
+      TextNode("build", TextType.IMAGE, "/b.svg"),
+      TextNode("](/ci)", TextType.TEXT),
+    ]
+    actual = TextNode.text_to_textnodes("[![build](/b.svg)](/ci)")
+
+    self.assertEqual(expected, actual)
+
   def test_text_to_textnodes_malformed_delimiters_BOLD(self):
     text = "This is **text with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
 
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from utilities import has_content, open_atomic
+
+
+class UtilitiesTest(unittest.TestCase):
+  def test_open_atomic_replaces_file(self):
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, "index.html")
+      with open(path, "w") as output_file:
+        output_file.write("old")
+
+      with open_atomic(path) as output_file:
+        output_file.write("new")
+
+      with open(path, "r") as output_file:
+        expected = "new"
+        actual = output_file.read()
+
+      self.assertEqual(expected, actual)
+      self.assertEqual(["index.html"], os.listdir(directory))
+
+  def test_open_atomic_failure_keeps_file(self):
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, "index.html")
+      with open(path, "w") as output_file:
+        output_file.write("old")
+
+      with self.assertRaises(ValueError):
+        with open_atomic(path) as output_file:
+          output_file.write("half a page")
+          raise ValueError("render failed")
+
+      with open(path, "r") as output_file:
+        expected = "old"
+        actual = output_file.read()
+
+      self.assertEqual(expected, actual)
+      self.assertEqual(["index.html"], os.listdir(directory))
+
+  def test_open_atomic_keep_unchanged(self):
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, "index.html")
+      with open(path, "w") as output_file:
+        output_file.write("same")
+      os.utime(path, ns=(0, 0))
+
+      with open_atomic(path, keep_unchanged=True) as output_file:
+        output_file.write("same")
+
+      expected = 0
+      actual = os.stat(path).st_mtime_ns
+
+      self.assertEqual(expected, actual)
+      self.assertEqual(["index.html"], os.listdir(directory))
+
+  def test_has_content(self):
+    with tempfile.TemporaryDirectory() as directory:
+      path = os.path.join(directory, "index.html")
+      with open(path, "wb") as output_file:
+        output_file.write(b"<p>Hello</p>")
+
+      self.assertTrue(has_content(path, b"<p>Hello</p>"))
+      self.assertFalse(has_content(path, b"<p>Hallo</p>"))
+      self.assertFalse(has_content(path, b"<p>Hello</p>\n"))
+      self.assertFalse(has_content(os.path.join(directory, "missing.html"), b""))
+
+if __name__ == "__main__":
+  unittest.main()
@@ -5,8 +5,7 @@ import re
 
 from htmlnode import HTMLNode
 from leafnode import LeafNode
-from parentnode import ParentNode
-from utilities import find_all, isEmptyOrWhitespaces
+from utilities import find_all, isEmptyOrWhitespaces, prefix_basepath
 
 class TextType(Enum):
   TEXT = "text"
@@ -35,8 +34,18 @@ class TextType(Enum):
 
   def __str__(self) -> str:
     return str(self.value)
+
+_INLINE_IMAGE_PATTERN = re.compile(r"!\[(.*?)\]\((([^()]|\([^()]*\))*)\)")
+_INLINE_LINK_PATTERN = re.compile(r"(?<!!)\[(.*?)\]\((([^()]|\([^()]*\))*)\)")
+_INLINE_DELIMITER_PATTERN = re.compile(r"\*\*|_|`")
+_INLINE_DELIMITER_TYPES = { 
+  "**": TextType.BOLD, 
+  "_": TextType.ITALIC, 
+  "`": TextType.CODE 
+}
    
 class TextNode:
+  __slots__ = ("text", "text_type", "url")
   
   def __init__(self, text: str, text_type: TextType, url: str | None = None) -> None:
     self.text = text
@@ -54,20 +63,20 @@ class TextNode:
   def __repr__(self) -> str:
     return f"TextNode({self.text}, {self.text_type}, {self.url})"
   
-  def to_leafnode(self) -> LeafNode:
+  def to_leafnode(self, basepath: str = "/") -> LeafNode:
     match self.text_type:
       case TextType.TEXT:
         return LeafNode(self.text)
       case TextType.BOLD:
-        return ParentNode("b", [ LeafNode(self.text) ])
+        return LeafNode(self.text, "b")
       case TextType.ITALIC:
-        return ParentNode("i", [ LeafNode(self.text) ])
+        return LeafNode(self.text, "i")
       case TextType.CODE:
-        return ParentNode("code", [ LeafNode(self.text) ])
+        return LeafNode(self.text, "code")
       case TextType.LINK:
-        return ParentNode("a", [ LeafNode(self.text) ], { "href": self.url })
+        return LeafNode(self.text, "a", { "href": prefix_basepath(self.url, basepath) })
       case TextType.IMAGE:
-        return LeafNode("", "img", { "src": self.url, "alt": self.text })
+        return LeafNode("", "img", { "src": prefix_basepath(self.url, basepath), "alt": self.text })
       case _:
         raise Exception("unknown text type")
       
@@ -195,16 +204,58 @@ class TextNode:
                                         TextNode.extract_markdown_links
                                         )
     
+  def _append_text(nodes: List[Self], text: str, text_type: TextType = TextType.TEXT) -> None:
+    if not isEmptyOrWhitespaces(text):
+      nodes.append(TextNode(text, text_type))
+
+  def _split_delimiters(text: str, start: int, end: int, nodes: List[Self]) -> None:
+    position = start
+
+    while position < end:
+      opening = _INLINE_DELIMITER_PATTERN.search(text, position, end)
+      if not opening:
+        break
+
+      delimiter = opening[0]
+      text_type = _INLINE_DELIMITER_TYPES[delimiter]
+      closing_index = text.find(delimiter, opening.end(), end)
+
+      if closing_index == -1:
+        if opening.end() < end:
+          raise Exception(f"Malformed {text_type} segment.")
+        
+        # a lone marker ending the text has nothing to format and is dropped
+        TextNode._append_text(nodes, text[position:opening.start()])
+        return
+
+      TextNode._append_text(nodes, text[position:opening.start()])
+      TextNode._append_text(nodes, text[opening.end():closing_index], text_type)
+      position = closing_index + len(delimiter)
+
+    TextNode._append_text(nodes, text[position:end])
+    
+  def _split_links(text: str, start: int, end: int, nodes: List[Self]) -> None:
+    position = start
+
+    # formatting never spans a link, so the text between links is split on its own
+    for match in _INLINE_LINK_PATTERN.finditer(text, start, end):
+      TextNode._split_delimiters(text, position, match.start(), nodes)
+      nodes.append(TextNode(match[1], TextType.LINK, match[2]))
+      position = match.end()
+
+    TextNode._split_delimiters(text, position, end, nodes)
+
   def text_to_textnodes(text: str) -> List[Self]:
-    original_node = TextNode(text, TextType.TEXT)
-
-    nodes_after_images_extraction = TextNode.split_nodes_image([original_node])
-    nodes_after_links_extraction  = TextNode.split_nodes_link(nodes_after_images_extraction)
-    nodes_after_bolds_extraction  = TextNode.split_nodes_delimiter(nodes_after_links_extraction,
-                                                                   TextType.BOLD)
-    nodes_after_italic_extraction = TextNode.split_nodes_delimiter(nodes_after_bolds_extraction,
-                                                                   TextType.ITALIC)
-    nodes_after_code_extraction = TextNode.split_nodes_delimiter(nodes_after_italic_extraction,
-                                                                 TextType.CODE)
-    return nodes_after_code_extraction
-  
+    '''Scans the text once, left to right, for images, links, bold, italic and code.'''
+    nodes: List[Self] = []
+    position = 0
+
+    # images take precedence, a "[" before an image never opens a link around it
+    for match in _INLINE_IMAGE_PATTERN.finditer(text):
+      TextNode._split_links(text, position, match.start(), nodes)
+      nodes.append(TextNode(match[1], TextType.IMAGE, match[2]))
+      position = match.end()
+
+    TextNode._split_links(text, position, len(text), nodes)
+
+    return nodes
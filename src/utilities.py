@@ -1,4 +1,7 @@
-from typing import Iterator, Tuple
+import contextlib
+import filecmp
+import os
+from typing import BinaryIO, Iterator, TextIO, Tuple
 
 def isEmptyOrWhitespaces(self: str) -> bool:
   return (len(self) == 0 or len(self.strip()) == 0)  
@@ -11,4 +14,62 @@ def find_all(self: str, pattern: str) -> Iterator[Tuple[int, str]]:
   # loop: continue the search and return more matches
   while i != -1:
     yield i
-    i = self.find(pattern, i + 1)
\ No newline at end of file
+    i = self.find(pattern, i + 1)
+
+def prefix_basepath(url: str, basepath: str) -> str:
+  '''Moves a root-relative url under basepath, the site may not be served from the domain root.'''
+  if url.startswith("/"):
+    return f"{basepath}{url[1:]}"
+
+  return url
+
+def remove_file(path: str, root: str) -> bool:
+  '''Removes the file and the directories it leaves empty, up to but never including root.'''
+  if not path or not os.path.exists(path):
+    return False
+
+  os.remove(path)
+
+  directory = os.path.dirname(path)
+  while (os.path.abspath(directory) != os.path.abspath(root) and 
+         os.path.isdir(directory) and 
+         not os.listdir(directory)):
+    os.rmdir(directory)
+    directory = os.path.dirname(directory)
+
+  return True
+
+def has_content(path: str, content: bytes) -> bool:
+  '''Whether the file at path holds exactly content, the size is compared before any byte is read.'''
+  try:
+    if os.path.getsize(path) != len(content):
+      return False
+
+    with open(path, "rb") as existing_file:
+      return existing_file.read() == content
+  except OSError:
+    return False
+
+@contextlib.contextmanager
+def open_atomic(path: str, 
+                buffer_size: int = 64 * 1024, 
+                keep_unchanged: bool = False,
+                mode: str = "w") -> Iterator[TextIO | BinaryIO]:
+  '''Opens a buffered temporary file next to path, it only replaces path once fully written.
+
+  With keep_unchanged, a path that already holds the same bytes is left untouched, mtime included.'''
+  # the pid keeps processes writing the same path from sharing a temporary file
+  temp_path = f"{path}.{os.getpid()}.tmp"
+  try:
+    with open(temp_path, mode, buffering=buffer_size) as output_file:
+      yield output_file
+
+    if keep_unchanged and os.path.isfile(path) and filecmp.cmp(temp_path, path, shallow=False):
+      os.remove(temp_path)
+    else:
+      os.replace(temp_path, path)
+  except BaseException:
+    # a failed or interrupted write leaves the previous file in place
+    if os.path.exists(temp_path):
+      os.remove(temp_path)
+    raise